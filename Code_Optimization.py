@@ -1,57 +1,256 @@
+"""
+Optimizer for the three-address code of ICG.CodeGenerator.
+
+The TAC is parsed once into tac_ir.Instruction objects, split into basic
+blocks (tac_cfg.build_cfg) and run through a pipeline of passes until none
+of them changes anything. Within each block:
+
+  - fold_constants        constant propagation and folding (2 + 3 -> 5)
+  - simplify_algebra      x + 0, 0 + x, x - 0, x * 1, 1 * x, x / 1 -> x
+  - eliminate_common_subexpressions
+                          a repeated a op b reuses the first result
+  - propagate_copies      uses of x after x = y read y instead
+
+and over the whole control-flow graph:
+
+  - eliminate_dead_code   liveness-based: drop assignments nobody reads
+
+Temporaries (%t1, %t2, ..., see tac_ir.is_temp) are dead at the end of the
+program, every other variable is live, including one the source named t1. All passes are linear scans with hash maps.
+
+Usage:
+  - python Code_Optimization.py       # example and a benchmark on large TAC
+"""
+
+from tac_cfg import as_cfg
+from tac_ir import Instruction, evaluate, format_tac, is_name, is_temp, parse_tac
+
+COMMUTATIVE = ("+", "*")
+
+
+# ---------------- Passes ----------------
+# Each pass takes and returns a list of straight-line Instructions (one basic
+# block) plus whether it changed anything. A name's value is only known until
+# the name is assigned again.
+
+def fold_constants(code):
+    constants = {}      # name → known constant value
+    changed = False
+    result = []
+    for ins in code:
+        args = ins.args
+        new_args = tuple(constants.get(a, a) if is_name(a) else a for a in args)
+        if new_args != args:
+            changed = True
+        op = ins.op
+        if op is not None and not is_name(new_args[0]) and not is_name(new_args[1]):
+            value = evaluate(op, new_args[0], new_args[1])
+            if value is not None:
+                op, new_args = None, (value,)
+                changed = True
+        constants.pop(ins.dest, None)
+        if op is None and not is_name(new_args[0]):
+            constants[ins.dest] = new_args[0]
+        result.append(ins if (op, new_args) == (ins.op, args) else Instruction(ins.dest, op, new_args))
+    return result, changed
+
+
+def simplify(op, a, b):
+    """
+    Simpler (op, args) for a op b, or None. Only int 0 and 1 are used as
+    identities: x + 0.0 would turn an int x into a float.
+    """
+    if op == "+":
+        if b == 0 and type(b) is int:
+            return None, (a,)
+        if a == 0 and type(a) is int:
+            return None, (b,)
+    elif op == "-":
+        if b == 0 and type(b) is int:
+            return None, (a,)
+    elif op == "*":
+        if b == 1 and type(b) is int:
+            return None, (a,)
+        if a == 1 and type(a) is int:
+            return None, (b,)
+    elif op == "/":
+        if b == 1 and type(b) is int:
+            return None, (a,)
+    return None
+
+
+def simplify_algebra(code):
+    changed = False
+    result = []
+    for ins in code:
+        simpler = simplify(ins.op, *ins.args) if ins.op is not None else None
+        if simpler is None:
+            result.append(ins)
+        else:
+            result.append(Instruction(ins.dest, simpler[0], simpler[1]))
+            changed = True
+    return result, changed
+
+
+def eliminate_common_subexpressions(code):
+    available = {}      # (op, a, b, types) → name holding its value
+    uses = {}           # name → keys of available that read or hold it
+    changed = False
+    result = []
+    for ins in code:
+        key = None
+        if ins.op is not None:
+            a, b = ins.args
+            if ins.op in COMMUTATIVE and repr(b) < repr(a):
+                a, b = b, a
+            # 0 == 0.0, but 0 - x and 0.0 - x are different values
+            key = (ins.op, a, b, type(a), type(b))
+            holder = available.get(key)
+            if holder is not None:
+                ins = Instruction(ins.dest, None, (holder,))
+                changed = True
+                key = None
+        # ins.dest gets a new value: forget what was computed from or into it
+        for stale in uses.pop(ins.dest, ()):
+            available.pop(stale, None)
+        if key is not None and ins.dest not in key:
+            available[key] = ins.dest
+            for name in (key[1], key[2], ins.dest):
+                if is_name(name):
+                    uses.setdefault(name, []).append(key)
+        result.append(ins)
+    return result, changed
+
+
+def propagate_copies(code):
+    copies = {}         # x → y after x = y, while neither is reassigned
+    readers = {}        # y → names x copied from it
+    changed = False
+    result = []
+    for ins in code:
+        args = tuple(copies.get(a, a) if is_name(a) else a for a in ins.args)
+        if args != ins.args:
+            ins = Instruction(ins.dest, ins.op, args)
+            changed = True
+        dest = ins.dest
+        source = copies.pop(dest, None)
+        if source is not None:
+            readers[source].discard(dest)
+        for x in readers.pop(dest, ()):
+            copies.pop(x, None)
+        if ins.op is None and is_name(args[0]) and args[0] != dest:
+            copies[dest] = args[0]
+            readers.setdefault(args[0], set()).add(dest)
+        result.append(ins)
+    return result, changed
+
+
+def eliminate_dead_code(code, live_out=None):
+    """
+    Drop instructions whose destination is not read before being assigned
+    again or the program ends. live_out: names live at the end (default:
+    every name that is not a temporary, see tac_ir.is_temp).
+    """
+    live = set(live_out) if live_out is not None else {ins.dest for ins in code if not is_temp(ins.dest)}
+    kept = []
+    for ins in reversed(code):
+        if ins.dest not in live:
+            continue
+        live.discard(ins.dest)
+        for a in ins.args:
+            if is_name(a):
+                live.add(a)
+        kept.append(ins)
+    kept.reverse()
+    return kept, len(kept) != len(code)
+
+
+def eliminate_dead_code_cfg(cfg, exit_live=None):
+    """eliminate_dead_code on every block of cfg, with the names live out of each block"""
+    live_in, live_out = cfg.liveness(exit_live)
+    changed = False
+    for block in cfg.blocks:
+        live = live_out[block.index]
+        if block.terminator is not None:
+            live = live | set(block.terminator.uses())
+        block.body, block_changed = eliminate_dead_code(block.body, live)
+        changed = changed or block_changed
+    return changed
+
+
+PASSES = (fold_constants, simplify_algebra, eliminate_common_subexpressions, propagate_copies)
+
+
+# ---------------- Optimizer ----------------
 class Optimizer:
-    def __init__(self, code):
+    def __init__(self, code, passes=PASSES, max_rounds=100):
+        # code: TAC lines (str), tac_ir.Instructions or a tac_cfg.CFG, not in SSA form
         self.code = code
+        self.passes = passes
+        self.max_rounds = max_rounds
+        self.rounds = 0
+
+    def optimize_cfg(self):
+        """The optimized CFG; a CFG passed in is changed in place"""
+        cfg = as_cfg(self.code)
+        if cfg.ssa:
+            # the passes treat x#1 and x#2 as unrelated names and ignore phis
+            raise ValueError("Cannot optimize SSA form (phi instructions, x#1 names)")
+        exit_live = cfg.exit_live()
+        self.rounds = 0
+        changed = True
+        while changed and self.rounds < self.max_rounds:
+            changed = False
+            for block in cfg.blocks:
+                for optimization in self.passes:
+                    block.body, pass_changed = optimization(block.body)
+                    changed = changed or pass_changed
+            changed = eliminate_dead_code_cfg(cfg, exit_live) or changed
+            self.rounds += 1
+        return cfg
+
+    def optimize_ir(self):
+        return self.optimize_cfg().instructions()
 
     def optimize(self):
-        optimized = []
-        constants = {}
-
-        for line in self.code:
-            # Example line: "t1 = 2 + 3"
-            parts = line.split("=")
-            lhs = parts[0].strip()
-            rhs = parts[1].strip()
-
-            # ---------------- Constant Folding ----------------
-            tokens = rhs.split()
-            if len(tokens) == 3 and tokens[0].isdigit() and tokens[2].isdigit():
-                a, op, b = tokens
-                a, b = int(a), int(b)
-                if op == "+": val = a + b
-                elif op == "-": val = a - b
-                elif op == "*": val = a * b
-                elif op == "/": val = a // b
-                rhs = str(val)
-                line = f"{lhs} = {rhs}"
-                constants[lhs] = rhs
-
-            # ---------------- Constant Propagation ----------------
-            else:
-                for var, value in constants.items():
-                    if rhs == var:
-                        rhs = value
-                        line = f"{lhs} = {rhs}"
-                    elif rhs.startswith(var + " "):  # var in expression
-                        rhs = rhs.replace(var, value)
-                        line = f"{lhs} = {rhs}"
-
-            # ---------------- Dead Code Elimination ----------------
-            # If a temp variable is assigned but never used later, skip it.
-            # (For simplicity, we keep all lines here. Real implementation needs live-variable analysis.)
-
-            optimized.append(line)
-
-        return optimized
+        return format_tac(self.optimize_ir())
+
+
+def benchmark(statements=20000, repeats=3):
+    """Instruction counts and best-of-`repeats` optimizer seconds on ICG output"""
+    import time
+
+    from ICG import CodeGenerator, Parser, lexer
+
+    lines = [f"int v{i}; int w{i};" for i in range(100)]
+    for i in range(statements):
+        a, b = f"v{i % 100}", f"v{(i * 7) % 100}"
+        lines.append(f"w{i % 100} = ({a} + {b}) * ({a} + {b}) + {i % 5} * 0 + {a} * 1 - (2 + 3) * {i % 3};")
+    tac = CodeGenerator().generate(Parser(lexer("\n".join(lines))).parse())
+    code = parse_tac(tac)
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        optimizer = Optimizer(code)
+        optimized = optimizer.optimize_ir()
+        best = min(best, time.perf_counter() - start)
+    return {"before": len(code), "after": len(optimized), "rounds": optimizer.rounds, "seconds": best}
 
 
 # ---------------- Example Usage ----------------
 if __name__ == "__main__":
     tac = [
-        "t1 = 2 + 3",
-        "t2 = t1 * 4",
-        "x = t2",
+        "%t1 = 2 + 3",
+        "%t2 = %t1 * 4",
+        "x = %t2",
         "y = x + 0",
         "z = y * 1",
+        "%t10 = a + b",
+        "%t11 = b + a",      # same as %t10
+        "w = %t10 * %t11",
+        "%t12 = w * 2",      # never read
+        "t1 = 7",           # a program variable despite its name: kept
     ]
 
     print("Original TAC:")
@@ -64,3 +263,7 @@ if __name__ == "__main__":
     print("\nOptimized TAC:")
     for line in optimized_tac:
         print(line)
+
+    stats = benchmark()
+    print(f"\nLarge TAC: {stats['before']} -> {stats['after']} instructions "
+          f"in {stats['rounds']} rounds, {stats['seconds']:.3f}s")
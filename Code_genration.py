@@ -1,28 +1,384 @@
+"""
+Backend: three-address code (ICG.py, tac_ir, tac_cfg) to assembly for a
+register machine with a fixed number of registers r0, r1, ...
+
+  LI r, 5             load immediate        LOAD r, x     memory to register
+  MOV r1, r2          register copy         STORE x, r    register to memory
+  ADD/SUB/MUL/DIV rd, a, b                  a, b: registers or immediates
+  JMP L / JNZ r, L    jump / jump if r is not zero
+
+Every TAC name lives either in one register for its whole live interval or,
+if it was spilled, in memory at its own name. Registers are assigned by
+linear scan (Poletto & Sarkar) over intervals computed from the liveness of
+the basic blocks; when something spills, two registers are kept back for
+the spill code. Program variables are loaded at the start if they are read
+before being assigned, and stored at the end.
+
+A peephole pass then forwards stored values to later loads in the same
+block, so "STORE x, r; LOAD r2, x" no longer reads memory, and drops the
+STORE too when x is a temporary nobody loads any more.
+
+stack_code() is the original stack-machine translation (PUSH/LOAD/STORE
+for every operand), kept as the baseline for metrics().
+
+Usage:
+  - python Code_genration.py          # example, then metrics on a large program
+"""
+
+from bisect import insort
+
+from tac_cfg import as_cfg
+from tac_ir import GOTO, IF, is_temp
+
+ALU = {"+": "ADD", "-": "SUB", "*": "MUL", "/": "DIV"}
+
+
+# ---------------- Live intervals ----------------
+def live_intervals(cfg, live_in, live_out):
+    """
+    {name: (start, end)} over the instructions of cfg in program order,
+    given its liveness(). Instruction i reads at position 2i and writes at
+    2i + 1, so a value last read by an instruction can share a register
+    with its result. Position -1 is the entry (loads of inputs), the last
+    one the exit.
+    """
+    start, end = {}, {}
+
+    def touch(name, position):
+        if name in start:
+            if position < start[name]:
+                start[name] = position
+            elif position > end[name]:
+                end[name] = position
+        else:
+            start[name] = end[name] = position
+
+    position = 0
+    for block in cfg.blocks:
+        first = position
+        for ins in block.body:
+            for name in ins.uses():
+                touch(name, position)
+            touch(ins.dest, position + 1)
+            position += 2
+        if block.terminator is not None:
+            for name in block.terminator.uses():
+                touch(name, position)
+            position += 2
+        if position == first:
+            continue
+        for name in live_in[block.index]:
+            touch(name, first)
+        for name in live_out[block.index]:
+            touch(name, position - 1)
+
+    for name in live_in[0] if cfg.blocks else ():
+        touch(name, -1)
+    for b in cfg.exits:
+        for name in live_out[b]:
+            touch(name, position)
+    return {name: (start[name], end[name]) for name in start}
+
+
+def linear_scan(intervals, registers):
+    """
+    {name: register index} for intervals {name: (start, end)}; names left
+    out are spilled. When no register is free, whichever interval ends last
+    (the new one or an active one) goes to memory.
+    """
+    free = list(range(registers - 1, -1, -1))
+    active = []         # (end, name), sorted
+    assigned = {}
+    for name, (start, end) in sorted(intervals.items(), key=lambda item: item[1]):
+        expired = 0
+        while expired < len(active) and active[expired][0] < start:
+            free.append(assigned[active[expired][1]])
+            expired += 1
+        del active[:expired]
+        if free:
+            assigned[name] = free.pop()
+            insort(active, (end, name))
+        elif active and active[-1][0] > end:
+            _, spilled = active.pop()
+            assigned[name] = assigned.pop(spilled)
+            insort(active, (end, name))
+    return assigned
+
+
+# ---------------- Code generation ----------------
 class CodeGenerator:
-    def __init__(self, tac):
+    def __init__(self, tac, registers=8, peephole=True):
+        # tac: TAC lines (str), tac_ir.Instructions or a tac_cfg.CFG, not in SSA form
         self.tac = tac
+        self.registers = registers
+        self.peephole = peephole
         self.assembly = []
+        self.locations = {}     # name → register; spilled names are missing
+        self.scratch = ()
+        self.code = []          # the assembly as tuples, see metrics()
 
     def generate(self):
-        for line in self.tac:
-            lhs, rhs = line.split("=")
-            lhs = lhs.strip()
-            rhs = rhs.strip()
-            tokens = rhs.split()
-
-            # Case 1: Direct assignment (x = 5, x = y)
-            if len(tokens) == 1:
-                if tokens[0].isdigit():
-                    self.assembly.append(f"PUSH {tokens[0]}")
-                else:
-                    self.assembly.append(f"LOAD {tokens[0]}")
-                self.assembly.append(f"STORE {lhs}")
-
-            # Case 2: Binary operation (t1 = a + b)
-            elif len(tokens) == 3:
-                a, op, b = tokens
-                # Load left operand
-                if a.isdigit():
-                    self.assembly.append(f"PUSH {a}")
+        if self.registers < 3:
+            raise ValueError("Need at least 3 registers, 2 are kept for spill code")
+        cfg = as_cfg(self.tac)
+        if cfg.ssa:
+            raise ValueError("Cannot generate code for SSA form (phi instructions, x#1 names)")
+        live_in, live_out = cfg.liveness()
+        intervals = live_intervals(cfg, live_in, live_out)
+        assigned = linear_scan(intervals, self.registers)
+        self.scratch = ()
+        if len(assigned) < len(intervals):
+            assigned = linear_scan(intervals, self.registers - 2)
+            self.scratch = (f"r{self.registers - 2}", f"r{self.registers - 1}")
+        self.locations = {name: f"r{index}" for name, index in assigned.items()}
+
+        code = self.emit(cfg, live_in, live_out)
+        if self.peephole:
+            code = peephole(code)
+        self.code = code
+        self.assembly = format_assembly(code)
+        return self.assembly
+
+    def emit(self, cfg, live_in, live_out):
+        locations = self.locations
+        scratch = self.scratch
+        out = []
+        append = out.append
+
+        def operand(a, k):
+            # register or immediate holding a, loading spilled names into scratch k
+            if type(a) is not str:
+                return a
+            register = locations.get(a)
+            if register is None:
+                register = scratch[k]
+                append(("LOAD", register, a))
+            return register
+
+        for name in sorted(live_in[0]) if cfg.blocks else ():
+            if name in locations:
+                append(("LOAD", locations[name], name))
+
+        for block in cfg.blocks:
+            if block.label is not None:
+                append(("LABEL", block.label))
+            for ins in block.body:
+                dest = locations.get(ins.dest)
+                target = dest or scratch[0]
+                if ins.op is None:
+                    a = ins.args[0]
+                    if type(a) is not str:
+                        append(("LI", target, a))
+                    else:
+                        source = operand(a, 0)
+                        if dest is None:
+                            append(("STORE", ins.dest, source))
+                            continue
+                        append(("MOV", target, source))
                 else:
-                    self.assembly.ap
+                    a, b = ins.args
+                    left = operand(a, 0)
+                    right = left if b == a and type(b) is str else operand(b, 1)
+                    append((ALU[ins.op], target, left, right))
+                if dest is None:
+                    append(("STORE", ins.dest, target))
+            terminator = block.terminator
+            if terminator is None:
+                continue
+            if terminator.op == GOTO:
+                append(("JMP", terminator.args[0]))
+            elif terminator.op == IF:
+                condition, label = terminator.args
+                if type(condition) is str:
+                    append(("JNZ", operand(condition, 0), label))
+                elif condition != 0:
+                    append(("JMP", label))
+
+        for b in cfg.exits:
+            for name in sorted(live_out[b]):
+                if name in locations:
+                    append(("STORE", name, locations[name]))
+        return out
+
+
+def stack_code(tac):
+    """The original stack-machine translation: every operand goes through memory"""
+    cfg = as_cfg(tac)
+    out = []
+    append = out.append
+
+    def push(a):
+        append(("LOAD", a) if type(a) is str else ("PUSH", a))
+
+    for block in cfg.blocks:
+        if block.label is not None:
+            append(("LABEL", block.label))
+        for ins in block.body:
+            push(ins.args[0])
+            if ins.op is not None:
+                push(ins.args[1])
+                append((ALU[ins.op],))
+            append(("STORE", ins.dest))
+        terminator = block.terminator
+        if terminator is not None and terminator.op == GOTO:
+            append(("JMP", terminator.args[0]))
+        elif terminator is not None:
+            push(terminator.args[0])
+            append(("JNZ", terminator.args[1]))
+    return out
+
+
+# ---------------- Peephole ----------------
+def peephole(code):
+    """
+    Store-to-load forwarding within a basic block for register code: while
+    a register still holds the value of memory name x (it was stored from or
+    loaded into it), LOAD r2, x becomes MOV r2, r, or nothing if r2 is r.
+    This removes every STORE x, r; LOAD r2, x pair. STOREs of temporaries
+    that are then never loaded, and MOV r, r, are dropped.
+    """
+    holds = {}          # memory name → register with the same value
+    held = {}           # register → memory names it holds
+
+    def overwrite(register):
+        for name in held.pop(register, ()):
+            if holds.get(name) == register:
+                del holds[name]
+
+    def remember(name, register):
+        holds[name] = register
+        held.setdefault(register, []).append(name)
+
+    result = []
+    for ins in code:
+        op = ins[0]
+        if op == "LABEL":
+            holds.clear()
+            held.clear()
+        elif op == "LOAD":
+            register, name = ins[1], ins[2]
+            source = holds.get(name)
+            if source is not None:
+                if source != register:
+                    overwrite(register)
+                    remember(name, register)
+                    result.append(("MOV", register, source))
+                continue
+            overwrite(register)
+            remember(name, register)
+        elif op == "STORE":
+            holds.pop(ins[1], None)
+            remember(ins[1], ins[2])
+        elif op == "MOV" and ins[1] == ins[2]:
+            continue
+        elif op not in ("JMP", "JNZ"):
+            overwrite(ins[1])
+        result.append(ins)
+
+    loaded = {ins[2] for ins in result if ins[0] == "LOAD"}
+    return [ins for ins in result
+            if not (ins[0] == "STORE" and ins[1] not in loaded and is_temp(ins[1]))]
+
+
+def stack_peephole(code):
+    """
+    STORE x; LOAD x -> DUP; STORE x for stack code, or nothing if x is a
+    temporary loaded nowhere else
+    """
+    loads = {}
+    for ins in code:
+        if ins[0] == "LOAD":
+            loads[ins[1]] = loads.get(ins[1], 0) + 1
+    result = []
+    for ins in code:
+        if ins[0] == "LOAD" and result and result[-1] == ("STORE", ins[1]):
+            store = result.pop()
+            if not (is_temp(ins[1]) and loads[ins[1]] == 1):
+                result.append(("DUP",))
+                result.append(store)
+            continue
+        result.append(ins)
+    return result
+
+
+def format_assembly(code):
+    lines = []
+    for ins in code:
+        if ins[0] == "LABEL":
+            lines.append(f"{ins[1]}:")
+        elif len(ins) == 1:
+            lines.append(ins[0])
+        else:
+            lines.append(f"{ins[0]} " + ", ".join(map(str, ins[1:])))
+    return lines
+
+
+def metrics(code):
+    """Instruction count and memory traffic (LOAD + STORE) of assembly tuples"""
+    loads = stores = instructions = 0
+    for ins in code:
+        op = ins[0]
+        if op == "LABEL":
+            continue
+        instructions += 1
+        if op == "LOAD":
+            loads += 1
+        elif op == "STORE":
+            stores += 1
+    return {"instructions": instructions, "loads": loads, "stores": stores, "memory": loads + stores}
+
+
+def benchmark(statements=2000, registers=(4, 8, 16)):
+    """metrics() of the stack code and of register code for each register count, with and without peephole"""
+    from Code_Optimization import Optimizer
+    from ICG import CodeGenerator as TACGenerator, Parser, lexer
+
+    lines = [f"int v{i};" for i in range(50)]
+    for i in range(statements):
+        a, b, c = f"v{i % 50}", f"v{(i * 7) % 50}", f"v{(i * 13) % 50}"
+        lines.append(f"v{(i * 3) % 50} = {a} * ({b} + {c} * ({a} - {i % 9})) - ({b} + {c}) / 2;")
+    tac = TACGenerator().generate(Parser(lexer("\n".join(lines))).parse())
+
+    rows = []
+    for name, code in (("unoptimized", tac), ("optimized", Optimizer(tac).optimize())):
+        stack = stack_code(code)
+        rows.append((name, "stack", metrics(stack)))
+        rows.append((name, "stack + peephole", metrics(stack_peephole(stack))))
+        for count in registers:
+            for use_peephole in (False, True):
+                generator = CodeGenerator(code, count, use_peephole)
+                generator.generate()
+                label = f"{count} registers" + (" + peephole" if use_peephole else "")
+                rows.append((name, label, metrics(generator.code)))
+    return rows
+
+
+# ---------------- Example Usage ----------------
+if __name__ == "__main__":
+    tac = [
+        "i = 0",
+        "s = 0",
+        "L1:",
+        "%t1 = 10 - i",
+        "if %t1 goto L2",
+        "goto L3",
+        "L2:",
+        "%t2 = i * i",
+        "%t3 = s + %t2",
+        "s = %t3",
+        "i = i + 1",
+        "goto L1",
+        "L3:",
+        "%t4 = s * 2",
+        "r = %t4 + base",
+    ]
+    for count in (8, 3):
+        generator = CodeGenerator(tac, registers=count)
+        print(f"Assembly, {count} registers:")
+        for line in generator.generate():
+            print(("  " if not line.endswith(":") else "") + line)
+        print(metrics(generator.code), "\n")
+
+    print(f"{'TAC':12s} {'code':22s} {'instructions':>12s} {'loads':>8s} {'stores':>8s}")
+    for name, label, row in benchmark():
+        print(f"{name:12s} {label:22s} {row['instructions']:12d} {row['loads']:8d} {row['stores']:8d}")
@@ -1,155 +1,150 @@
-import re
-
-# ---------------- Lexer ----------------
-token_specification = [
-    ("NUMBER",   r'\d+(\.\d*)?'),
-    ("ID",       r'[A-Za-z_]\w*'),
-    ("ASSIGN",   r'='),
-    ("PLUS",     r'\+'),
-    ("MINUS",    r'-'),
-    ("MUL",      r'\*'),
-    ("DIV",      r'/'),
-    ("SEMI",     r';'),
-    ("LPAREN",   r'\('),
-    ("RPAREN",   r'\)'),
-    ("TYPE",     r'int|float'),
-    ("SKIP",     r'[ \t\n]+'),
-    ("MISMATCH", r'.'),
-]
-
-tok_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specification)
-
-def lexer(code):
-    tokens = []
-    for mo in re.finditer(tok_regex, code):
-        kind = mo.lastgroup
-        value = mo.group()
-        if kind == "NUMBER":
-            value = float(value) if '.' in value else int(value)
-            tokens.append(("NUMBER", value))
-        elif kind in ("ID", "TYPE"):
-            tokens.append((kind, value))
-        elif kind == "SKIP":
-            continue
-        elif kind == "MISMATCH":
-            raise RuntimeError(f"Unexpected character {value!r}")
-        else:
-            tokens.append((kind, value))
-    tokens.append(("EOF", None))
-    return tokens
-
-# ---------------- Parser ----------------
-class Parser:
-    def __init__(self, tokens):
-        self.tokens = tokens
-        self.pos = 0
-        self.current_token = tokens[self.pos]
-
-    def eat(self, token_type):
-        if self.current_token[0] == token_type:
-            self.pos += 1
-            self.current_token = self.tokens[self.pos]
-        else:
-            raise SyntaxError(f"Expected {token_type}, got {self.current_token}")
-
-    def parse(self):
-        statements = []
-        while self.current_token[0] != "EOF":
-            statements.append(self.statement())
-        return ("PROGRAM", statements)
-
-    def statement(self):
-        if self.current_token[0] == "TYPE":  # Declaration
-            type_token = self.current_token
-            self.eat("TYPE")
-            var_name = self.current_token
-            self.eat("ID")
-            self.eat("SEMI")
-            return ("DECL", type_token[1], var_name[1])
-        elif self.current_token[0] == "ID":  # Assignment
-            var_name = self.current_token
-            self.eat("ID")
-            self.eat("ASSIGN")
-            expr_node = self.expr()
-            self.eat("SEMI")
-            return ("ASSIGN", var_name[1], expr_node)
-        else:
-            raise SyntaxError(f"Invalid statement: {self.current_token}")
-
-    def expr(self):
-        node = self.term()
-        while self.current_token[0] in ("PLUS", "MINUS"):
-            op = self.current_token
-            self.eat(op[0])
-            right = self.term()
-            node = ("BIN_OP", op[1], node, right)
-        return node
-
-    def term(self):
-        node = self.factor()
-        while self.current_token[0] in ("MUL", "DIV"):
-            op = self.current_token
-            self.eat(op[0])
-            right = self.factor()
-            node = ("BIN_OP", op[1], node, right)
-        return node
-
-    def factor(self):
-        token = self.current_token
-        if token[0] == "NUMBER":
-            self.eat("NUMBER")
-            return ("NUMBER", token[1])
-        elif token[0] == "ID":
-            self.eat("ID")
-            return ("ID", token[1])
-        elif token[0] == "LPAREN":
-            self.eat("LPAREN")
-            node = self.expr()
-            self.eat("RPAREN")
-            return node
-        else:
-            raise SyntaxError(f"Unexpected token {token}")
+from ast_nodes import ASSIGN, BIN_OP, BLOCK, DECL, ID, NUMBER, PROGRAM, Node
+# Same language as Semantic_analysis.py, so the lexer and parser are shared
+from Semantic_analysis import Parser, ScopedSymbolTable, lexer
+from tac_ir import temp_name
 
 # ---------------- Intermediate Code Generator ----------------
 class CodeGenerator:
     def __init__(self):
         self.temp_count = 0
         self.code = []
+        # TAC has no scopes: a declaration that shadows an outer one gets a
+        # fresh name (x.1, x.2, ...), and names maps source names to them
+        self.names = ScopedSymbolTable()
+        self.shadow_count = 0
 
     def new_temp(self):
+        # %t1, %t2, ...: no source name can clash with a temporary
         self.temp_count += 1
-        return f"t{self.temp_count}"
+        return temp_name(self.temp_count)
+
+    def declare(self, name):
+        tac_name = name
+        if name in self.names:
+            self.shadow_count += 1
+            tac_name = f"{name}.{self.shadow_count}"
+        self.names.declare(name, tac_name)
 
     def generate(self, node):
+        if isinstance(node, Node):
+            return self.generate_node(node)
         node_type = node[0]
 
         if node_type == "PROGRAM":
-            for stmt in node[1]:
-                self.generate(stmt)
+            self.generate_statements(node[1])
+            return self.code
+
+        elif node_type == "BLOCK":
+            self.generate_statements([node])
             return self.code
 
         elif node_type == "DECL":
             # We don’t generate code for declarations in TAC
-            return
+            self.declare(node[2])
 
         elif node_type == "ASSIGN":
             _, var_name, expr = node
-            expr_result = self.generate(expr)
-            self.code.append(f"{var_name} = {expr_result}")
-
-        elif node_type == "NUMBER":
-            return str(node[1])
-
-        elif node_type == "ID":
-            return node[1]
-
-        elif node_type == "BIN_OP":
-            _, op, left, right = node
-            left_res = self.generate(left)
-            right_res = self.generate(right)
-            temp = self.new_temp()
-            self.code.append(f"{temp} = {left_res} {op} {right_res}")
-            return temp
+            expr_result = self.generate_expr(expr)
+            self.code.append(f"{self.names.lookup(var_name) or var_name} = {expr_result}")
+
+        elif node_type in ("NUMBER", "ID", "BIN_OP"):
+            return self.generate_expr(node)
+
+    def generate_statements(self, statements):
+        """Statements in order, tuples or typed nodes; blocks are flattened with an explicit stack"""
+        names = self.names
+        open_blocks = [iter(statements)]
+        while open_blocks:
+            stmt = next(open_blocks[-1], None)
+            if stmt is None:
+                open_blocks.pop()
+                if open_blocks:
+                    names.pop_scope()
+                continue
+            if isinstance(stmt, Node):
+                body = stmt.statements if stmt.op == BLOCK else None
+            else:
+                body = stmt[1] if stmt[0] == "BLOCK" else None
+            if body is None:
+                self.generate(stmt)
+            else:
+                names.push_scope()
+                open_blocks.append(iter(body))
+
+    def generate_expr(self, node):
+        """
+        TAC for an expression; returns the name holding its value.
+        A post-order walk with an explicit stack: a BIN_OP is pushed once to
+        visit its operands (left first) and once more, as (None, op), to emit
+        its instruction, so temporaries are numbered exactly as a recursive
+        walk would number them.
+        """
+        code = self.code
+        # names only need mapping once some declaration was renamed
+        lookup = self.names.lookup if self.shadow_count else str
+        results = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            node_type = node[0]
+            if node_type == "BIN_OP":
+                stack.append((None, node[1]))
+                stack.append(node[3])
+                stack.append(node[2])
+            elif node_type == "NUMBER":
+                results.append(str(node[1]))
+            elif node_type == "ID":
+                results.append(lookup(node[1]) or node[1])
+            elif node_type is None:
+                # both operands are done
+                right_res = results.pop()
+                temp = self.new_temp()
+                code.append(f"{temp} = {results[-1]} {node[1]} {right_res}")
+                results[-1] = temp
+        return results[0]
+
+    # Same output for the typed AST of ast_nodes.py, dispatching on node.op
+    def generate_node(self, node):
+        op = node.op
+        if op == ASSIGN:
+            expr_result = self.generate_node_expr(node.expr)
+            self.code.append(f"{self.names.lookup(node.name) or node.name} = {expr_result}")
+        elif op == DECL:
+            self.declare(node.name)
+        elif op == PROGRAM:
+            self.generate_statements(node.statements)
+            return self.code
+        elif op == BLOCK:
+            self.generate_statements([node])
+            return self.code
+        elif op in (BIN_OP, ID, NUMBER):
+            return self.generate_node_expr(node)
+
+    def generate_node_expr(self, node):
+        code = self.code
+        # names only need mapping once some declaration was renamed
+        lookup = self.names.lookup if self.shadow_count else str
+        results = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if type(node) is tuple:
+                # (None, operator): both operands are done
+                right_res = results.pop()
+                temp = self.new_temp()
+                code.append(f"{temp} = {results[-1]} {node[1]} {right_res}")
+                results[-1] = temp
+                continue
+            op = node.op
+            if op == BIN_OP:
+                stack.append((None, node.operator))
+                stack.append(node.right)
+                stack.append(node.left)
+            elif op == ID:
+                results.append(lookup(node.name) or node.name)
+            elif op == NUMBER:
+                results.append(str(node.value))
+        return results[0]
 
 # ---------------- Example Usage ----------------
 if __name__ == "__main__":
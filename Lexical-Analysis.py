@@ -1,4 +1,4 @@
-import re
+from lexer_engine import Lexer
 
 # Define token specifications
 token_specification = [
@@ -20,29 +20,12 @@ token_specification = [
 # Predefined keywords
 keywords = {"if", "else", "while", "for", "int", "float", "return", "print"}
 
-# Build the regex pattern
-tok_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specification)
+# Compile the lexer once (see lexer_engine.py)
+LEXER = Lexer(token_specification, keywords=keywords, skip=("NEWLINE", "SKIP"), eof=False)
 
 def lexer(code):
-    tokens = []
-    for mo in re.finditer(tok_regex, code):
-        kind = mo.lastgroup
-        value = mo.group()
-        if kind == "NUMBER":
-            value = float(value) if '.' in value else int(value)
-            tokens.append((kind, value))
-        elif kind == "ID":
-            if value in keywords:
-                tokens.append(("KEYWORD", value))
-            else:
-                tokens.append((kind, value))
-        elif kind == "NEWLINE" or kind == "SKIP":
-            continue
-        elif kind == "MISMATCH":
-            raise RuntimeError(f"Unexpected character {value!r}")
-        else:
-            tokens.append((kind, value))
-    return tokens
+    """Tokens of code as a TokenTable (iterates as (kind, value) pairs)"""
+    return LEXER.tokenize(code)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-import re
+from lexer_engine import Lexer
 
 # ---------------- Lexer ----------------
 token_specification = [
@@ -14,38 +14,26 @@ token_specification = [
     ("MISMATCH", r'.'),
 ]
 
-tok_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specification)
+LEXER = Lexer(token_specification)
 
 def lexer(code):
-    tokens = []
-    for mo in re.finditer(tok_regex, code):
-        kind = mo.lastgroup
-        value = mo.group()
-        if kind == "NUMBER":
-            value = float(value) if '.' in value else int(value)
-            tokens.append(("NUMBER", value))
-        elif kind == "ID":
-            tokens.append(("ID", value))
-        elif kind == "SKIP":
-            continue
-        elif kind == "MISMATCH":
-            raise RuntimeError(f"Unexpected character {value!r}")
-        else:
-            tokens.append((kind, value))
-    tokens.append(("EOF", None))
-    return tokens
+    """Tokens of code, ending with ("EOF", None); see lexer_engine.py"""
+    return LEXER.tokenize(code)
+
+# binary operator token → precedence, all left-associative
+PRECEDENCE = {"PLUS": 1, "MINUS": 1, "MUL": 2, "DIV": 2}
 
 # ---------------- Parser ----------------
 class Parser:
     def __init__(self, tokens):
-        self.tokens = tokens
-        self.pos = 0
-        self.current_token = tokens[self.pos]
+        # Any iterable of tokens works, including the lazy
+        # LEXER.stream(file), so only one token is held at a time
+        self.tokens = iter(tokens)
+        self.current_token = next(self.tokens)
 
     def eat(self, token_type):
         if self.current_token[0] == token_type:
-            self.pos += 1
-            self.current_token = self.tokens[self.pos]
+            self.current_token = next(self.tokens)
         else:
             raise SyntaxError(f"Expected {token_type}, got {self.current_token}")
 
@@ -53,42 +41,57 @@ class Parser:
         return self.expr()
 
     # Grammar:
-    # expr → term ((PLUS | MINUS) term)*
+    # expr   → term ((PLUS | MINUS) term)*
+    # term   → factor ((MUL | DIV) factor)*
+    # factor → NUMBER | ID | LPAREN expr RPAREN
+    # Parsed with explicit operand/operator stacks (shunting-yard) rather
+    # than one Python call per nesting level, so very long or deeply
+    # nested expressions cannot hit the recursion limit.
     def expr(self):
-        node = self.term()
-        while self.current_token[0] in ("PLUS", "MINUS"):
-            op = self.current_token
-            self.eat(op[0])
-            right = self.term()
-            node = ("BIN_OP", op, node, right)
-        return node
+        tokens = self.tokens
+        reduce = self.reduce
+        operands = []
+        operators = []      # operator tokens; None marks an open LPAREN
+        depth = 0
+        while True:
+            # operand: any LPARENs, then NUMBER | ID
+            token = self.current_token
+            while token[0] == "LPAREN":
+                operators.append(None)
+                depth += 1
+                token = self.current_token = next(tokens)
+            if token[0] == "NUMBER" or token[0] == "ID":
+                operands.append((token[0], token[1]))
+            else:
+                raise SyntaxError(f"Unexpected token {token}")
+            self.current_token = next(tokens)
 
-    # term → factor ((MUL | DIV) factor)*
-    def term(self):
-        node = self.factor()
-        while self.current_token[0] in ("MUL", "DIV"):
-            op = self.current_token
-            self.eat(op[0])
-            right = self.factor()
-            node = ("BIN_OP", op, node, right)
-        return node
+            # after an operand: any RPARENs closing open groups, then an operator or the end
+            kind = self.current_token[0]
+            while kind == "RPAREN" and depth:
+                while operators[-1] is not None:
+                    reduce(operands, operators)
+                operators.pop()
+                depth -= 1
+                self.current_token = next(tokens)
+                kind = self.current_token[0]
+            precedence = PRECEDENCE.get(kind)
+            if precedence is None:
+                if depth:
+                    self.eat("RPAREN")  # raises: unclosed LPAREN
+                while operators:
+                    reduce(operands, operators)
+                return operands[0]
+            # operators of equal precedence are left-associative
+            while operators and operators[-1] is not None and PRECEDENCE[operators[-1][0]] >= precedence:
+                reduce(operands, operators)
+            operators.append(self.current_token)
+            self.current_token = next(tokens)
 
-    # factor → NUMBER | ID | LPAREN expr RPAREN
-    def factor(self):
-        token = self.current_token
-        if token[0] == "NUMBER":
-            self.eat("NUMBER")
-            return ("NUMBER", token[1])
-        elif token[0] == "ID":
-            self.eat("ID")
-            return ("ID", token[1])
-        elif token[0] == "LPAREN":
-            self.eat("LPAREN")
-            node = self.expr()
-            self.eat("RPAREN")
-            return node
-        else:
-            raise SyntaxError(f"Unexpected token {token}")
+    @staticmethod
+    def reduce(operands, operators):
+        right = operands.pop()
+        operands[-1] = ("BIN_OP", operators.pop(), operands[-1], right)
 
 # ---------------- Example Usage ----------------
 if __name__ == "__main__":
@@ -0,0 +1,332 @@
+"""
+Compact typed AST for the Semantic_analysis.py / ICG.py language.
+
+The parsers build nested tuples such as ("BIN_OP", "+", left, right) and
+every consumer dispatches on node[0] string comparisons. The classes here
+hold the same fields in __slots__ (no per-node __dict__) and carry a small
+integer opcode, so a walker dispatches on node.op with int comparisons.
+
+from_tuple() / to_tuple() convert between the two forms; the round trip is
+exact, including the ("PLUS", "+") token operators of Syntax-Analysis.py.
+to_postfix() / from_postfix() flatten a tuple AST for serializing.
+SemanticAnalyzer.analyze and CodeGenerator.generate accept either form.
+
+Usage:
+  - python ast_nodes.py               # memory per node and walker speedup
+"""
+
+# opcodes, indexes into OP_NAMES
+PROGRAM, DECL, ASSIGN, BIN_OP, NUMBER, ID, BLOCK = range(7)
+OP_NAMES = ("PROGRAM", "DECL", "ASSIGN", "BIN_OP", "NUMBER", "ID", "BLOCK")
+
+
+class Node:
+    __slots__ = ()
+    fields = ()     # the slots that are part of the tree, compared and printed
+    op = None
+
+    def __eq__(self, other):
+        # pairwise with an explicit stack, for arbitrarily deep trees
+        stack = [(self, other)]
+        while stack:
+            a, b = stack.pop()
+            if type(a) is not type(b):
+                return False
+            for name in a.fields:
+                x, y = getattr(a, name), getattr(b, name)
+                if isinstance(x, Node):
+                    stack.append((x, y))
+                elif isinstance(x, list):
+                    if len(x) != len(y):
+                        return False
+                    stack.extend(zip(x, y))
+                elif x != y:
+                    return False
+        return True
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(repr(getattr(self, name)) for name in self.fields)
+        return f"{type(self).__name__}({fields})"
+
+
+class Program(Node):
+    __slots__ = fields = ("statements",)
+    op = PROGRAM
+
+    def __init__(self, statements):
+        self.statements = statements
+
+
+class Block(Node):
+    __slots__ = fields = ("statements",)
+    op = BLOCK
+
+    def __init__(self, statements):
+        self.statements = statements
+
+
+class Decl(Node):
+    __slots__ = fields = ("var_type", "name")
+    op = DECL
+
+    def __init__(self, var_type, name):
+        self.var_type = var_type
+        self.name = name
+
+
+class Assign(Node):
+    __slots__ = fields = ("name", "expr")
+    op = ASSIGN
+
+    def __init__(self, name, expr):
+        self.name = name
+        self.expr = expr
+
+
+class BinOp(Node):
+    fields = ("operator", "left", "right")
+    # SemanticAnalyzer's memo: expr_type is valid while type_version is
+    # its symbol table's version, so typing needs no side table
+    __slots__ = fields + ("type_version", "expr_type")
+    op = BIN_OP
+
+    def __init__(self, operator, left, right):
+        self.operator = operator
+        self.left = left
+        self.right = right
+        self.type_version = None
+
+
+class Number(Node):
+    __slots__ = fields = ("value",)
+    op = NUMBER
+
+    def __init__(self, value):
+        self.value = value
+
+
+class Id(Node):
+    __slots__ = fields = ("name",)
+    op = ID
+
+    def __init__(self, name):
+        self.name = name
+
+
+# The converters walk with an explicit stack, so they handle expressions
+# nested deeper than the recursion limit. (None, node) on the stack means
+# "the children of node are done, build it from the results".
+
+def from_tuple(node):
+    """Typed node for a tuple AST node"""
+    results = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        kind = node[0]
+        if kind is None:
+            node = node[1]
+            kind = node[0]
+            if kind == "BIN_OP":
+                right = results.pop()
+                results[-1] = BinOp(node[1], results[-1], right)
+            elif kind == "ASSIGN":
+                results[-1] = Assign(node[1], results[-1])
+            else:
+                count = len(node[1])
+                statements = results[len(results) - count:]
+                del results[len(results) - count:]
+                results.append(Program(statements) if kind == "PROGRAM" else Block(statements))
+        elif kind == "BIN_OP":
+            stack.append((None, node))
+            stack.append(node[3])
+            stack.append(node[2])
+        elif kind == "NUMBER":
+            results.append(Number(node[1]))
+        elif kind == "ID":
+            results.append(Id(node[1]))
+        elif kind == "ASSIGN":
+            stack.append((None, node))
+            stack.append(node[2])
+        elif kind == "DECL":
+            results.append(Decl(node[1], node[2]))
+        elif kind == "PROGRAM" or kind == "BLOCK":
+            stack.append((None, node))
+            stack.extend(reversed(node[1]))
+        else:
+            raise ValueError(f"Unknown AST node {kind!r}")
+    return results[0]
+
+
+def to_tuple(node):
+    """Tuple AST node for a typed node"""
+    results = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if type(node) is tuple:
+            node = node[1]
+            op = node.op
+            if op == BIN_OP:
+                right = results.pop()
+                results[-1] = ("BIN_OP", node.operator, results[-1], right)
+            elif op == ASSIGN:
+                results[-1] = ("ASSIGN", node.name, results[-1])
+            else:
+                count = len(node.statements)
+                statements = results[len(results) - count:]
+                del results[len(results) - count:]
+                results.append((OP_NAMES[op], statements))
+            continue
+        op = node.op
+        if op == BIN_OP:
+            stack.append((None, node))
+            stack.append(node.right)
+            stack.append(node.left)
+        elif op == NUMBER:
+            results.append(("NUMBER", node.value))
+        elif op == ID:
+            results.append(("ID", node.name))
+        elif op == ASSIGN:
+            stack.append((None, node))
+            stack.append(node.expr)
+        elif op == DECL:
+            results.append(("DECL", node.var_type, node.name))
+        elif op == PROGRAM or op == BLOCK:
+            stack.append((None, node))
+            stack.extend(reversed(node.statements))
+        else:
+            raise ValueError(f"Unknown AST node {node!r}")
+    return results[0]
+
+
+def to_postfix(node):
+    """
+    Tuple AST as a flat postfix list of [kind, fields...] items, for
+    serializing: json and pickle recurse, this list nests one level only.
+    BIN_OP, ASSIGN, BLOCK and PROGRAM take their children from the items
+    before them.
+    """
+    items = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        kind = node[0]
+        if kind is None:
+            node = node[1]
+            kind = node[0]
+            if kind == "BIN_OP" or kind == "ASSIGN":
+                items.append([kind, node[1]])
+            else:
+                items.append([kind, len(node[1])])
+        elif kind == "BIN_OP":
+            stack.append((None, node))
+            stack.append(node[3])
+            stack.append(node[2])
+        elif kind == "ASSIGN":
+            stack.append((None, node))
+            stack.append(node[2])
+        elif kind == "PROGRAM" or kind == "BLOCK":
+            stack.append((None, node))
+            stack.extend(reversed(node[1]))
+        else:
+            items.append(list(node))
+    return items
+
+
+def from_postfix(items):
+    """Tuple AST for a to_postfix() list (also after a json round trip)"""
+    results = []
+    for item in items:
+        kind = item[0]
+        if kind == "BIN_OP":
+            operator = tuple(item[1]) if type(item[1]) is list else item[1]
+            right = results.pop()
+            results[-1] = ("BIN_OP", operator, results[-1], right)
+        elif kind == "ASSIGN":
+            results[-1] = ("ASSIGN", item[1], results[-1])
+        elif kind == "PROGRAM" or kind == "BLOCK":
+            count = item[1]
+            statements = results[len(results) - count:]
+            del results[len(results) - count:]
+            results.append((kind, statements))
+        elif kind in OP_NAMES:
+            results.append(tuple(item))
+        else:
+            raise ValueError(f"Unknown AST node {kind!r}")
+    return results[0]
+
+
+def count_nodes(node):
+    """Number of nodes in a tuple AST"""
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        kind = node[0]
+        if kind == "PROGRAM" or kind == "BLOCK":
+            stack.extend(node[1])
+        elif kind == "ASSIGN":
+            stack.append(node[2])
+        elif kind == "BIN_OP":
+            stack.append(node[2])
+            stack.append(node[3])
+    return count
+
+
+def allocated_bytes(build):
+    """Bytes still allocated after build() returns (its result is kept alive)"""
+    import tracemalloc
+
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+if __name__ == "__main__":
+    import time
+
+    # the walkers check isinstance against the importable module's classes
+    from ast_nodes import count_nodes, from_tuple, to_tuple
+    from ICG import CodeGenerator
+    from Semantic_analysis import SemanticAnalyzer, Parser, lexer
+
+    lines = []
+    for i in range(20000):
+        lines.append(f"int v{i};")
+        lines.append(f"v{i} = v{i} + {i} * (v{i} - 2) / 3;")
+    source = "\n".join(lines)
+    tokens = lexer(source)
+    tuple_ast = Parser(tokens).parse()
+    typed_ast = from_tuple(tuple_ast)
+    assert to_tuple(typed_ast) == tuple_ast
+    nodes = count_nodes(tuple_ast)
+
+    # Identifiers and numbers are shared with the token table, so this is
+    # the cost of the node objects (and statement list) alone
+    tuple_bytes = allocated_bytes(lambda: Parser(tokens).parse())
+    typed_bytes = allocated_bytes(lambda: from_tuple(tuple_ast))
+    print(f"{nodes} nodes")
+    print(f"  tuples:  {tuple_bytes / nodes:5.1f} bytes/node")
+    print(f"  slots:   {typed_bytes / nodes:5.1f} bytes/node")
+
+    def best_of(func, repeats=5):
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    for name, walk in [("SemanticAnalyzer.analyze", lambda ast: SemanticAnalyzer().analyze(ast)),
+                       ("CodeGenerator.generate", lambda ast: CodeGenerator().generate(ast))]:
+        t_tuple = best_of(lambda: walk(tuple_ast))
+        t_typed = best_of(lambda: walk(typed_ast))
+        print(f"{name}: tuples {t_tuple * 1000:.1f} ms, slots {t_typed * 1000:.1f} ms "
+              f"({t_tuple / t_typed:.2f}x)")
@@ -1,5 +1,38 @@
+"""
+Measure how the running time of a function grows with its input size, and
+fit the growth exponent: t(n) ~ c * n^k, so k is about 1 for O(n) and 2
+for O(n^2).
+
+Timing follows the usual rules for small, noisy measurements:
+
+  - time.perf_counter_ns(), never time.time()
+  - warmup calls before timing
+  - a function too fast to time alone is called `number` times per trial,
+    with number raised (1, 2, 5, 10, 20, ...) until a trial takes min_time
+  - `repeats` trials per size; median and interquartile range, not mean
+  - the garbage collector is off while timing (and collected before)
+  - scale_sizes() doubles n until one call takes a millisecond (by
+    measure() medians, not single calls), so the fit is not dominated by
+    call overhead at tiny n
+  - sizes whose IQR stays above a tenth of the median are left out of the
+    fit rather than letting one noisy point tilt it
+
+fit_exponent() is a least-squares line through (log n, log t), and
+exponent_interval() the 95% confidence interval of its slope.
+
+Usage:
+  - python asymptotic_notation.py         # the example algorithms and their exponents
+  - python asymptotic_notation.py --plot  # and a log-log plot (needs matplotlib)
+
+benchmark_registry.py runs registered functions of the whole repository
+with this timing, and keeps and compares JSON baselines.
+"""
+
+import argparse
+import gc
+import math
+import statistics
 import time
-import matplotlib.pyplot as plt
 
 # Example algorithms with different time complexities
 
@@ -29,39 +62,212 @@ def cubic_algo(n):
 
 # Measure runtime for different input sizes
 def measure_time(func, n):
-    start = time.time()
+    """Milliseconds for one call of func(n); see measure() for a reliable number"""
+    start = time.perf_counter_ns()
     func(n)
-    end = time.time()
-    return (end - start) * 1000  # in ms
+    return (time.perf_counter_ns() - start) / 1e6
 
-if __name__ == "__main__":
-    input_sizes = [10, 50, 100, 200]
 
-    algorithms = {
-        "O(1) Constant": constant_algo,
-        "O(n) Linear": linear_algo,
-        "O(n^2) Quadratic": quadratic_algo,
-        "O(n^3) Cubic": cubic_algo,
-    }
+def time_calls(func, arg, number):
+    """Nanoseconds for `number` calls of func(arg)"""
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        func(arg)
+    return time.perf_counter_ns() - start
+
+
+def calibrate(func, arg, min_time=0.01):
+    """Calls per trial (1, 2, 5, 10, 20, ...) so that a trial takes at least min_time seconds"""
+    number = 1
+    while True:
+        for step in (1, 2, 5):
+            if time_calls(func, arg, number * step) >= min_time * 1e9:
+                return number * step
+        number *= 10
+
+
+def measure(func, n, repeats=7, warmup=1, min_time=0.01, disable_gc=True):
+    """
+    Seconds per call of func(n): {"n", "number", "median", "iqr", "times"}
+    over `repeats` trials of `number` calls each.
+    """
+    for _ in range(warmup):
+        func(n)
+    number = calibrate(func, n, min_time)
+    gc.collect()
+    enabled = gc.isenabled()
+    if disable_gc:
+        gc.disable()
+    try:
+        times = [time_calls(func, n, number) / number / 1e9 for _ in range(repeats)]
+    finally:
+        if enabled:
+            gc.enable()
+    if len(times) > 1:
+        q1, median, q3 = statistics.quantiles(times, n=4, method="inclusive")
+    else:
+        q1 = median = q3 = times[0]
+    return {"n": n, "number": number, "median": median, "iqr": q3 - q1, "times": times}
+
+
+def scale_sizes(func, start=8, factor=2, count=5, min_time=1e-3, max_time=0.25, max_n=2 ** 22,
+                probe_time=0.005):
+    """
+    `count` input sizes growing by `factor`, starting at the first n where
+    one call takes min_time seconds, and stopping before a call is predicted
+    to take more than max_time. Functions that never get that slow get the
+    last sizes below max_n.
+    Call times are measure() medians (warmed up, 3 trials of probe_time),
+    not single calls, so one slow call does not pick the sizes.
+    """
+    def call_time(n):
+        return measure(func, n, repeats=3, min_time=probe_time)["median"]
+
+    n = start
+    elapsed = call_time(n)
+    while elapsed < min_time and n * factor <= max_n:
+        n *= factor
+        elapsed = call_time(n)
+    if elapsed < min_time:
+        # never measurable alone, e.g. O(1): measure() repeats the call anyway
+        sizes = [n]
+        while len(sizes) < count and sizes[0] // factor >= start:
+            sizes.insert(0, sizes[0] // factor)
+        return sizes
+
+    sizes = [n]
+    growth = factor     # time ratio per step, predicted from the last step
+    while len(sizes) < count and n * factor <= max_n and elapsed * growth <= max_time:
+        n *= factor
+        previous, elapsed = elapsed, call_time(n)
+        sizes.append(n)
+        growth = max(elapsed / previous, 1)
+    return sizes
+
 
-    results = {name: [] for name in algorithms}
+def fit_exponent(sizes, times):
+    """(k, r2): least-squares fit of log t = k log n + c, and its coefficient of determination"""
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(t) for t in times]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx == 0:
+        return 0.0, 1.0
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    k = sxy / sxx
+    ss_total = sum((y - mean_y) ** 2 for y in ys)
+    ss_residual = sum((y - mean_y - k * (x - mean_x)) ** 2 for x, y in zip(xs, ys))
+    return k, (1 - ss_residual / ss_total if ss_total else 1.0)
 
-    for n in input_sizes:
-        for name, func in algorithms.items():
-            t = measure_time(func, n)
-            results[name].append(t)
 
-    # Print results
-    print("Execution times (ms):")
-    for name, times in results.items():
-        print(f"{name}: {times}")
+# two-sided 95% quantiles of Student's t for 1..10 degrees of freedom
+_T95 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228)
 
-    # Plot results
-    for name, times in results.items():
-        plt.plot(input_sizes, times, marker='o', label=name)
+
+def exponent_interval(sizes, times):
+    """
+    Half-width of the 95% confidence interval of fit_exponent()'s k, from
+    the standard error of the slope; inf with fewer than 3 sizes.
+    """
+    dof = len(sizes) - 2
+    if dof < 1:
+        return math.inf
+    k, _ = fit_exponent(sizes, times)
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(t) for t in times]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    ss_residual = sum((y - mean_y - k * (x - mean_x)) ** 2 for x, y in zip(xs, ys))
+    t = _T95[dof - 1] if dof <= len(_T95) else 1.96
+    return t * math.sqrt(ss_residual / dof / sxx)
+
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def complexity(func, sizes=None, repeats=7, warmup=1, min_time=0.01, disable_gc=True,
+               max_spread=0.1, retries=2):
+    """
+    measure() func at each size (scale_sizes() if none are given) and fit
+    the growth exponent: {"sizes", "measurements", "exponent", "interval",
+    "r2", "dropped"}. A size whose IQR is more than max_spread of its median
+    is measured again up to `retries` times; if it stays that noisy it is
+    left out of the fit (listed in "dropped"), as long as 3 sizes remain.
+    "interval" is the half-width of the 95% confidence interval of the
+    exponent.
+    """
+    if sizes is None:
+        sizes = scale_sizes(func)
+    measurements = []
+    for n in sizes:
+        m = measure(func, n, repeats, warmup, min_time, disable_gc)
+        for _ in range(retries):
+            if m["iqr"] <= max_spread * m["median"]:
+                break
+            again = measure(func, n, repeats, warmup, min_time, disable_gc)
+            if again["iqr"] / again["median"] < m["iqr"] / m["median"]:
+                m = again
+        measurements.append(m)
+
+    steady = [m for m in measurements if m["iqr"] <= max_spread * m["median"]]
+    if len(steady) < 3:
+        steady = measurements
+    fitted = [m["n"] for m in steady]
+    times = [m["median"] for m in steady]
+    exponent, r2 = fit_exponent(fitted, times)
+    return {"sizes": list(sizes), "measurements": measurements, "exponent": exponent,
+            "interval": exponent_interval(fitted, times), "r2": r2,
+            "dropped": [m["n"] for m in measurements if m not in steady]}
+
+
+def plot(results):
+    """Log-log plot of complexity() reports {name: report}; matplotlib is only imported here"""
+    import matplotlib.pyplot as plt
+
+    for name, report in results.items():
+        plt.loglog(report["sizes"], [m["median"] * 1e3 for m in report["measurements"]], marker='o', label=name)
 
     plt.xlabel("Input size (n)")
     plt.ylabel("Execution time (ms)")
     plt.title("Asymptotic Notation Demonstration")
     plt.legend()
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--plot", action="store_true", help="show a log-log plot of the results (needs matplotlib)")
+    args = p.parse_args()
+
+    algorithms = {
+        "O(1) Constant": (constant_algo, 0),
+        "O(n) Linear": (linear_algo, 1),
+        "O(n^2) Quadratic": (quadratic_algo, 2),
+        "O(n^3) Cubic": (cubic_algo, 3),
+    }
+
+    results = {}
+    for name, (func, expected) in algorithms.items():
+        report = complexity(func)
+        results[name] = report
+        print(f"{name}:")
+        for m in report["measurements"]:
+            print(f"  n={m['n']:8d}  median {format_seconds(m['median']):>9s}  IQR {format_seconds(m['iqr']):>9s}"
+                  f"  ({m['number']} calls/trial)")
+        if report["dropped"]:
+            print(f"  too noisy, not fitted: n={', '.join(map(str, report['dropped']))}")
+        # lower-order terms (loop overhead) bias the fit a little beyond the interval
+        low = report["exponent"] - report["interval"] - 0.25
+        high = report["exponent"] + report["interval"] + 0.25
+        verdict = "ok" if low <= expected <= high else "UNEXPECTED"
+        print(f"  fitted exponent {report['exponent']:.2f} +- {report['interval']:.2f} (95% CI, r2 {report['r2']:.3f}),"
+              f" expected {expected}: {verdict}")
+
+    if args.plot:
+        plot(results)
@@ -0,0 +1,364 @@
+"""
+Registry of benchmarks over the functions of this repository, with JSON
+baselines and regression detection.
+
+A benchmark is a function, an input generator setup(n) that builds its
+arguments for size n (outside the timing) and the sizes to run it at:
+
+    from benchmark_registry import register
+
+    @register("mymodule.solve", setup=lambda n: (list(range(n)),), sizes=(1000, 10000))
+    def solve(items):
+        ...
+
+Each (benchmark, size) is timed like asymptotic_notation.measure(): median
+and interquartile range over `repeats` trials, and the raw per-call times,
+which are what a baseline file keeps. The trials of all cases are
+interleaved, so drift of a busy machine is shared by every sample.
+
+compare() tests each size against a baseline with a one-sided Mann-Whitney
+U test on the raw times; a size is a regression when the slowdown is
+significant (p < alpha) and the median is at least `threshold` times the
+baseline's, so noise alone never fails a run. A baseline median of 0 (a
+coarse clock) gives ratio inf and leaves the decision to the U test.
+
+Nothing here imports matplotlib, so it runs headless (CI, ssh).
+
+Usage:
+  - python benchmark_registry.py list
+  - python benchmark_registry.py run --save baseline.json
+  - python benchmark_registry.py compare baseline.json   # exit status 1 on a regression
+  - python benchmark_registry.py run --filter 'matmul.*' --repeats 11
+"""
+
+import argparse
+import datetime
+import fnmatch
+import gc
+import json
+import math
+import platform
+import statistics
+import sys
+
+from asymptotic_notation import calibrate, fit_exponent, format_seconds, measure, time_calls
+
+BENCHMARKS = {}     # name → Benchmark, in registration order
+
+
+class Benchmark:
+    def __init__(self, name, func, setup, sizes, repeats=7):
+        self.name = name
+        self.func = func
+        self.setup = setup          # n → tuple of arguments for func
+        self.sizes = list(sizes)
+        self.repeats = repeats
+
+    def measure(self, n, repeats=None, min_time=0.01):
+        """asymptotic_notation.measure() of func(*setup(n)); the setup is not timed"""
+        return measure(self.bind(n), n, repeats or self.repeats, min_time=min_time)
+
+    def bind(self, n):
+        """func with the arguments for size n built, as a function of one ignored argument"""
+        args = self.setup(n)
+        func = self.func
+        return lambda _: func(*args)
+
+
+def register(name, func=None, setup=None, sizes=(1,), repeats=7):
+    """
+    Register func(*setup(n)) as benchmark `name` at each of `sizes`. Without
+    setup, func is called with n itself. Without func, returns a decorator.
+    """
+    if func is None:
+        return lambda f: register(name, f, setup, sizes, repeats)
+    if name in BENCHMARKS:
+        raise ValueError(f"Benchmark {name!r} is already registered")
+    BENCHMARKS[name] = Benchmark(name, func, setup or (lambda n: (n,)), sizes, repeats)
+    return func
+
+
+def select(patterns=None):
+    """Registered benchmarks whose name matches one of the glob patterns (all without patterns)"""
+    register_builtins()
+    if not patterns:
+        return list(BENCHMARKS.values())
+    return [b for name, b in BENCHMARKS.items() if any(fnmatch.fnmatchcase(name, p) for p in patterns)]
+
+
+# ---------------- Built-in benchmarks ----------------
+_builtins_registered = False
+
+
+def register_builtins():
+    """Register the repository's own benchmarks; their modules are imported only now"""
+    global _builtins_registered
+    if _builtins_registered:
+        return
+    _builtins_registered = True
+
+    import random
+
+    import numpy as np
+
+    from Code_Optimization import Optimizer
+    from ICG import CodeGenerator, Parser
+    from Semantic_analysis import LEXER
+    from asymptotic_notation import linear_algo, quadratic_algo
+    from matmul import matmul
+    from sparse_matmul import CSRMatrix
+    from strassen import DEFAULT_LEAF_SIZE
+    from tac_vm import VM, compile_tac, loop_tac
+    from tictactoe import check_winner
+
+    register("asymptotic.linear", linear_algo, sizes=(10000, 100000))
+    register("asymptotic.quadratic", quadratic_algo, sizes=(100, 300))
+
+    def dense(n):
+        rng = np.random.default_rng(n)
+        return rng.random((n, n)), rng.random((n, n))
+
+    def sparse(n):
+        rng = np.random.default_rng(n)
+        A = rng.random((n, n)) * (rng.random((n, n)) < 0.01)
+        return CSRMatrix.from_dense(A), rng.random((n, n))
+
+    # an explicit leaf size, so timings do not depend on a calibration file under ~
+    for method, sizes, kwargs in (("blas", (128, 512), {}), ("classic", (128, 256), {}),
+                                  ("strassen", (128, 256), {"leaf_size": DEFAULT_LEAF_SIZE}),
+                                  ("strassen_peel", (96, 192), {"leaf_size": DEFAULT_LEAF_SIZE})):
+        register(f"matmul.{method}",
+                 lambda A, B, method=method, kwargs=kwargs: matmul(A, B, method=method, **kwargs),
+                 setup=dense, sizes=sizes)
+    register("matmul.sparse", lambda A, B: matmul(A, B, method="sparse"), setup=sparse, sizes=(256, 1024))
+
+    def source(n):
+        lines = [f"int v{i};" for i in range(50)]
+        for i in range(n):
+            a, b = f"v{i % 50}", f"v{(i * 7) % 50}"
+            lines.append(f"v{(i * 3) % 50} = ({a} + {b}) * 2 - ({a} - {i % 9}) / 3;  // statement {i}")
+        return "\n".join(lines)
+
+    register("lexer.tokenize", LEXER.tokenize, setup=lambda n: (source(n),), sizes=(1000, 10000))
+
+    def tac(n):
+        return (CodeGenerator().generate(Parser(LEXER.tokenize(source(n))).parse()),)
+
+    register("optimizer.optimize", lambda code: Optimizer(code).optimize(), setup=tac, sizes=(500, 2000))
+    register("tac_vm.run", lambda vm: vm.run(), setup=lambda n: (VM(compile_tac(loop_tac(n))),),
+             sizes=(1000, 10000))
+
+    def boards(n):
+        rng = random.Random(n)
+        return [[[rng.choice("XO ") for _ in range(3)] for _ in range(3)] for _ in range(n)],
+
+    register("tictactoe.check_winner", lambda boards: [check_winner(b, "X") for b in boards],
+             setup=boards, sizes=(1000, 10000))
+
+
+# ---------------- Running ----------------
+def run(benchmarks, repeats=None, min_time=0.01, log=None, sizes=None):
+    """
+    {name: {str(n): measurement}} for the given benchmarks, measurements as
+    in asymptotic_notation.measure(). sizes: {name: [n, ...]} to run instead
+    of a benchmark's registered sizes. The trials of all sizes are interleaved
+    round-robin rather than run back to back, so a slow spell of the machine
+    spreads over every sample instead of shifting one of them.
+    log(name, measurement) is called once everything is measured.
+    """
+    cases = []
+    for benchmark in benchmarks:
+        for n in benchmark.sizes if sizes is None else sizes.get(benchmark.name, benchmark.sizes):
+            call = benchmark.bind(n)
+            call(n)     # warmup
+            cases.append((benchmark, n, call, calibrate(call, n, min_time), []))
+
+    rounds = max(repeats or benchmark.repeats for benchmark in benchmarks) if cases else 0
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(rounds):
+            gc.collect()
+            for benchmark, n, call, number, times in cases:
+                if i < (repeats or benchmark.repeats):
+                    times.append(time_calls(call, n, number) / number / 1e9)
+    finally:
+        if enabled:
+            gc.enable()
+
+    results = {}
+    for benchmark, n, _, number, times in cases:
+        if len(times) > 1:
+            q1, median, q3 = statistics.quantiles(times, n=4, method="inclusive")
+        else:
+            q1 = median = q3 = times[0]
+        m = {"n": n, "number": number, "median": median, "iqr": q3 - q1, "times": times}
+        results.setdefault(benchmark.name, {})[str(n)] = m
+        if log is not None:
+            log(benchmark.name, m)
+    return results
+
+
+def save_baseline(path, results):
+    data = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# ---------------- Comparison ----------------
+def _u_counts(m, n):
+    """counts[u]: orderings of m x's and n y's with u pairs (x, y) where x > y"""
+    table = [[1] for _ in range(n + 1)]     # row i = 0: no x, u is always 0
+    for i in range(1, m + 1):
+        row = [[1]]
+        for j in range(1, n + 1):
+            counts = [0] * (i * j + 1)
+            for u, c in enumerate(table[j]):    # the largest value is an x: beats all j y's
+                counts[u + j] += c
+            for u, c in enumerate(row[j - 1]):  # the largest value is a y: beats no x
+                counts[u] += c
+            row.append(counts)
+        table = row
+    return table[n]
+
+
+def mann_whitney(xs, ys):
+    """
+    (U, p) of the one-sided Mann-Whitney U test that xs tend to be larger
+    than ys. U counts pairs with x > y (ties count 1/2). p is exact for
+    small samples without ties, else from the normal approximation with tie
+    and continuity correction.
+    """
+    m, n = len(xs), len(ys)
+    u = sum((x > y) + 0.5 * (x == y) for x in xs for y in ys)
+    values = sorted(list(xs) + list(ys))
+    ties = len(values) != len(set(values))
+    if not ties and m + n <= 40:
+        counts = _u_counts(m, n)
+        return u, sum(counts[int(u):]) / sum(counts)
+
+    mean = m * n / 2
+    tie_term = 0
+    i = 0
+    while i < len(values):
+        j = i
+        while j < len(values) and values[j] == values[i]:
+            j += 1
+        tie_term += (j - i) ** 3 - (j - i)
+        i = j
+    total = m + n
+    variance = m * n / 12 * ((total + 1) - tie_term / (total * (total - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(baseline, results, alpha=0.01, threshold=1.1):
+    """
+    One row per (benchmark, size) present in both: baseline and current
+    median, their ratio, the p-value of "current is slower" and a verdict:
+    "slower" (a regression), "faster" (significant the other way) or "same".
+    """
+    rows = []
+    for name, sizes in results.items():
+        for n, current in sizes.items():
+            base = baseline.get(name, {}).get(n)
+            if base is None:
+                continue
+            if base["median"] > 0:
+                ratio = current["median"] / base["median"]
+            else:
+                # nothing to scale against: the U test alone decides
+                ratio = math.inf if current["median"] > 0 else 1.0
+            _, p_slower = mann_whitney(current["times"], base["times"])
+            _, p_faster = mann_whitney(base["times"], current["times"])
+            if p_slower < alpha and ratio >= threshold:
+                verdict = "slower"
+            elif p_faster < alpha and ratio <= 1 / threshold:
+                verdict = "faster"
+            else:
+                verdict = "same"
+            rows.append({"name": name, "n": int(n), "baseline": base["median"], "current": current["median"],
+                         "ratio": ratio, "p": p_slower, "verdict": verdict})
+    return rows
+
+
+# ---------------- Command line ----------------
+def print_measurement(name, m):
+    print(f"{name:26s} n={m['n']:<7d} median {format_seconds(m['median']):>9s}  "
+          f"IQR {format_seconds(m['iqr']):>9s}  ({m['number']} calls/trial)", flush=True)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Run registered benchmarks, save and compare JSON baselines")
+    commands = p.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list the registered benchmarks")
+    for command in ("run", "compare"):
+        c = commands.add_parser(command)
+        if command == "compare":
+            c.add_argument("baseline", help="baseline JSON written by run --save")
+            c.add_argument("--alpha", type=float, default=0.01, help="significance level (default 0.01)")
+            c.add_argument("--threshold", type=float, default=1.1,
+                           help="smallest median ratio reported as a slowdown (default 1.1)")
+        c.add_argument("--filter", nargs="+", metavar="PATTERN", help="glob patterns of benchmark names")
+        c.add_argument("--repeats", type=int, help="trials per size (default: per benchmark, usually 7)")
+        c.add_argument("--min-time", type=float, default=0.01, help="seconds per trial (default 0.01)")
+        c.add_argument("--save", metavar="FILE", help="write the results as a baseline")
+    args = p.parse_args(argv)
+
+    if args.command == "list":
+        for benchmark in select():
+            print(f"{benchmark.name:26s} sizes {', '.join(map(str, benchmark.sizes))}")
+        return 0
+
+    benchmarks = select(args.filter)
+    if not benchmarks:
+        p.error(f"no benchmark matches {args.filter}")
+    baseline = load_baseline(args.baseline)["results"] if args.command == "compare" else None
+    sizes = None
+    if baseline is not None:
+        # sizes the baseline does not have cannot be compared, so are not run;
+        # the registered benchmarks themselves are left as they are
+        sizes = {benchmark.name: [n for n in benchmark.sizes if str(n) in baseline.get(benchmark.name, {})]
+                 for benchmark in benchmarks}
+        benchmarks = [benchmark for benchmark in benchmarks if sizes[benchmark.name]]
+
+    results = run(benchmarks, args.repeats, args.min_time, print_measurement, sizes)
+    for name, sizes in results.items():
+        if len(sizes) > 1:
+            k, r2 = fit_exponent([int(n) for n in sizes], [m["median"] for m in sizes.values()])
+            print(f"{name:26s} time ~ n^{k:.2f} (r2 {r2:.3f})")
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"Saved {args.save}")
+    if baseline is None:
+        return 0
+
+    print()
+    rows = compare(baseline, results, args.alpha, args.threshold)
+    for row in rows:
+        print(f"{row['name']:26s} n={row['n']:<7d} {format_seconds(row['baseline']):>9s} -> "
+              f"{format_seconds(row['current']):>9s}  x{row['ratio']:.2f}  p={row['p']:.4f}  {row['verdict']}")
+    if rows:
+        # every case slower by about the same factor is more likely the machine than the code
+        print(f"median ratio over all comparisons x{statistics.median(row['ratio'] for row in rows):.2f}")
+    regressions = [row for row in rows if row["verdict"] == "slower"]
+    print(f"{len(regressions)} regression(s) in {len(rows)} comparisons")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+On-disk cache of compilation results, keyed by the sha256 of the source
+text and the compiler version, with least-recently-used eviction once the
+stored results exceed a size limit.
+
+Layout of the cache directory:
+
+  index.json          version, use clock, and per key: blob size, last use
+                      and the small part of the result (errors, timings);
+                      per source path: (mtime_ns, size, key) of its last run;
+                      per output file: the key of the result written to it
+  objects/ab/<key>.json
+                      the large part of the result (AST, symbol table, TAC)
+
+A run over unchanged files reads only index.json and stats the sources: a
+path whose mtime and size match its last run reuses the key without reading
+or hashing the file, and blobs are only loaded when asked for. A different
+version empties the cache.
+
+Usage:
+  - python compile_cache.py           # cold and warm runs over 10000 files
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def write_json(path, data):
+    """Write atomically: readers see the old file or the new one, never half of one"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    # json.dumps takes the C encoder, json.dump(data, f) the pure Python one
+    text = json.dumps(data, separators=(",", ":"))
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def source_hash(paths, salt=""):
+    """sha256 of the given files' content, e.g. the modules a compiler is made of"""
+    digest = hashlib.sha256(salt.encode())
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class CompileCache:
+    def __init__(self, directory, version, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.version = version
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(directory, "index.json")
+        index = None
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if index is None or index.get("version") != version:
+            # results of another compiler version are never hit again
+            shutil.rmtree(os.path.join(directory, "objects"), ignore_errors=True)
+            index = {"version": version, "clock": 0, "entries": {}, "files": {}, "outputs": {}}
+        self.clock = index["clock"]
+        self.entries = index["entries"]     # key → {"size", "used", "meta"}
+        self.files = index["files"]         # path → [mtime_ns, size, key]
+        self.outputs = index.get("outputs", {})     # output path → key of its content
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.version}\0{text}".encode()).hexdigest()
+
+    def known_key(self, path, stat):
+        """Key of path from its last run if os.stat() says it did not change, else None"""
+        known = self.files.get(path)
+        if known is not None and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+            return known[2] if known[2] in self.entries else None
+        return None
+
+    def remember_file(self, path, stat, key):
+        self.files[path] = [stat.st_mtime_ns, stat.st_size, key]
+
+    def output_key(self, path):
+        """Key of the result last written to output file path, or None"""
+        return self.outputs.get(path)
+
+    def remember_output(self, path, key):
+        """Record that path holds the output of key's result; None: it holds nothing of ours"""
+        if key is None:
+            self.outputs.pop(path, None)
+        else:
+            self.outputs[path] = key
+
+    def object_path(self, key):
+        return os.path.join(self.directory, "objects", key[:2], key + ".json")
+
+    def get(self, key):
+        """The small part of a cached result, or None; counts as a use"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.clock += 1
+        entry["used"] = self.clock
+        return entry["meta"]
+
+    def load(self, key):
+        """The large part of a cached result, or None if it is gone"""
+        try:
+            with open(self.object_path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, meta, blob):
+        """Store a result: meta is kept in the index, blob in its own file"""
+        path = self.object_path(key)
+        write_json(path, blob)
+        self.clock += 1
+        self.entries[key] = {"size": os.path.getsize(path), "used": self.clock, "meta": meta}
+
+    def size(self):
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def evict(self):
+        """Drop least recently used results until the blobs fit in max_bytes"""
+        total = self.size()
+        if total <= self.max_bytes:
+            return 0
+        evicted = set()
+        for key, entry in sorted(self.entries.items(), key=lambda item: item[1]["used"]):
+            if total <= self.max_bytes:
+                break
+            total -= entry["size"]
+            evicted.add(key)
+            try:
+                os.remove(self.object_path(key))
+            except OSError:
+                pass
+        for key in evicted:
+            del self.entries[key]
+        self.files = {path: known for path, known in self.files.items() if known[2] not in evicted}
+        self.outputs = {path: key for path, key in self.outputs.items() if key not in evicted}
+        return len(evicted)
+
+    def save(self):
+        """Evict, then write the index"""
+        self.evict()
+        write_json(self.index_path, {"version": self.version, "clock": self.clock,
+                                     "entries": self.entries, "files": self.files,
+                                     "outputs": self.outputs})
+
+
+def benchmark(files=10000, workers=None):
+    """Seconds for a cold and a warm compile_directory() over generated files"""
+    import tempfile
+    import time
+
+    from compile_driver import compile_directory
+
+    with tempfile.TemporaryDirectory() as root:
+        sources = os.path.join(root, "src")
+        for i in range(files):
+            directory = os.path.join(sources, f"d{i // 500}")
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"f{i}.src"), "w") as f:
+                f.write(f"int a; float b;\na = {i} + 2 * 3;\n{{ int c; c = a * {i % 7}; b = c + 0.5; }}\n")
+        cache_dir = os.path.join(root, "cache")
+        times = {}
+        for run in ("cold", "warm"):
+            start = time.perf_counter()
+            compile_directory(sources, workers=workers, cache_dir=cache_dir)
+            times[run] = time.perf_counter() - start
+        return times
+
+
+if __name__ == "__main__":
+    times = benchmark()
+    print(f"10000 files: cold {times['cold']:.2f}s, warm {times['warm']:.3f}s")
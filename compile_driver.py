@@ -0,0 +1,227 @@
+"""
+Compile a directory of source files through the whole front end:
+lexer -> Parser -> SemanticAnalyzer -> CodeGenerator (ICG.py), in a pool of
+worker processes, writing the three-address code of every file to a .tac
+file and printing a per-stage timing breakdown. Every lexical, syntax and
+semantic error of a file is reported, not just the first one.
+
+Results (AST, symbol table, TAC, errors) are kept in a compile_cache
+keyed by the file content and the compiler version, so files that did not
+change since the last run are not compiled again. A TAC file is rewritten
+only when it was last written from a different result, and removed when
+its source now has errors.
+
+Usage:
+  - python compile_driver.py src/                     # every *.src file below src/
+  - python compile_driver.py src/ --workers 8 --out build/
+  - python compile_driver.py src/ --no-cache
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ast_nodes import to_postfix
+from compile_cache import DEFAULT_MAX_BYTES, CompileCache, source_hash
+from diagnostics import Diagnostics
+from ICG import CodeGenerator, Parser
+from Semantic_analysis import SemanticAnalyzer, scan_tokens
+
+STAGES = ("lex", "parse", "semantic", "icg")
+DEFAULT_CACHE_DIR = ".compile_cache"
+# part of the cache version with the source of the modules below; bump when
+# the result format changes
+PIPELINE_VERSION = 3
+PIPELINE_MODULES = ("lexer_engine", "Semantic_analysis", "ICG", "ast_nodes", "diagnostics", "compile_driver")
+
+
+def compile_source(text):
+    """
+    Run every stage on text, collecting all lexical, syntax and semantic
+    errors rather than stopping at the first. Returns {"ast", "symbols":
+    {name: type}, "tac": [...] or None, "errors": [str], "times": {stage:
+    seconds}}; TAC is only generated for files without errors.
+    """
+    diagnostics = Diagnostics(text)
+    times = {}
+
+    start = time.perf_counter()
+    tokens = list(scan_tokens(text, diagnostics))
+    times["lex"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parser = Parser(tokens, diagnostics)
+    ast = parser.parse()
+    times["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analyzer = SemanticAnalyzer(diagnostics, parser.spans)
+    analyzer.analyze(ast)
+    times["semantic"] = time.perf_counter() - start
+
+    tac = None
+    if not diagnostics.items:
+        start = time.perf_counter()
+        tac = CodeGenerator().generate(ast)
+        times["icg"] = time.perf_counter() - start
+    return {"ast": ast, "symbols": analyzer.symbol_table.visible(), "tac": tac,
+            "errors": [str(d) for d in diagnostics.sorted()], "times": times}
+
+
+def _compile_job(job):
+    """Worker entry point: (path, text) -> (path, result), with the AST flattened for pickling"""
+    path, text = job
+    result = compile_source(text)
+    result["ast"] = to_postfix(result["ast"])
+    return path, result
+
+
+def pipeline_version():
+    """PIPELINE_VERSION plus a hash of the compiler's own source, so any change to it misses the cache"""
+    import importlib
+
+    paths = [importlib.import_module(name).__file__ for name in PIPELINE_MODULES]
+    return source_hash(paths, salt=str(PIPELINE_VERSION))[:16]
+
+
+# ---------------- Driver ----------------
+def find_sources(directory, extension=".src"):
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(extension))
+    return paths
+
+
+def tac_path(path, directory, out_dir):
+    base = os.path.splitext(path)[0] + ".tac"
+    if out_dir is None:
+        return base
+    return os.path.join(out_dir, os.path.relpath(base, directory))
+
+
+def compile_directory(directory, out_dir=None, workers=None, cache_dir=DEFAULT_CACHE_DIR,
+                      extension=".src", max_cache_bytes=DEFAULT_MAX_BYTES):
+    """
+    Compile every file ending in extension below directory and write its TAC.
+    Returns {path: result} where result is as from compile_source() plus
+    "cached": bool; cached results only carry "errors" and "times" (the
+    rest is in the cache, see CompileCache.load). cache_dir=None disables
+    the cache.
+    """
+    cache = CompileCache(cache_dir, pipeline_version(), max_cache_bytes) if cache_dir is not None else None
+    results = {}
+    jobs = []
+    keys = {}
+    stats = {}
+    for path in find_sources(directory, extension):
+        key = None
+        if cache is not None:
+            stats[path] = stat = os.stat(path)
+            key = cache.known_key(path, stat)
+        if key is None:
+            with open(path) as f:
+                text = f.read()
+            if cache is None:
+                jobs.append((path, text))
+                continue
+            key = cache.key(text)
+        keys[path] = key
+        cached = cache.get(key)
+        if cached is not None:
+            results[path] = dict(cached, cached=True)
+            cache.remember_file(path, stats[path], key)
+        else:
+            jobs.append((path, text))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        compiled = list(map(_compile_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # a few files per task keeps the pickling overhead small
+            compiled = list(pool.map(_compile_job, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+    for path, result in compiled:
+        if cache is not None:
+            cache.put(keys[path], {"errors": result["errors"], "times": result["times"]},
+                      {"ast": result["ast"], "symbols": result["symbols"], "tac": result["tac"]})
+            cache.remember_file(path, stats[path], keys[path])
+        result["cached"] = False
+        results[path] = result
+
+    for path, result in results.items():
+        target = tac_path(path, directory, out_dir)
+        key = keys.get(path)
+        if result["errors"]:
+            # no stale TAC from an older, error-free version of the file
+            try:
+                os.remove(target)
+            except FileNotFoundError:
+                pass
+            if cache is not None:
+                cache.remember_output(target, None)
+            continue
+        tac = result.get("tac")
+        if result["cached"]:
+            # an edit A -> B -> A hits A's result while target holds B's TAC
+            if cache.output_key(target) == key and os.path.exists(target):
+                continue
+            blob = cache.load(key)
+            tac = blob and blob["tac"]
+        if tac is not None:
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            with open(target, "w") as f:
+                f.write("\n".join(tac) + "\n")
+            if cache is not None:
+                cache.remember_output(target, key)
+    if cache is not None:
+        cache.save()
+    return dict(sorted(results.items()))
+
+
+def print_report(results, directory, wall):
+    totals = dict.fromkeys(STAGES, 0.0)
+    print(f"{'file':30s} {'status':8s} " + " ".join(f"{stage:>9s}" for stage in STAGES))
+    for path, result in results.items():
+        name = os.path.relpath(path, directory)
+        if result["cached"]:
+            status = "cached"
+        else:
+            status = "error" if result["errors"] else "ok"
+        times = result["times"]
+        if not result["cached"]:
+            for stage, seconds in times.items():
+                totals[stage] += seconds
+        print(f"{name:30s} {status:8s} " +
+              " ".join(f"{times[stage] * 1000:7.2f}ms" if stage in times else f"{'-':>9s}" for stage in STAGES))
+        for error in result["errors"]:
+            print(f"    {error}")
+
+    compiled = sum(not result["cached"] for result in results.values())
+    errors = sum(len(result["errors"]) for result in results.values())
+    print(f"\n{len(results)} files: {compiled} compiled, {len(results) - compiled} from cache, {errors} errors")
+    print("stage totals (compiled files, summed over workers): " +
+          ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in totals.items()))
+    print(f"wall time {wall:.3f}s")
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument('directory', help='directory with the source files')
+    p.add_argument('--out', type=str, default=None, help='TAC output directory (default: next to the sources)')
+    p.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    p.add_argument('--ext', type=str, default='.src', help='source file extension')
+    p.add_argument('--cache-dir', type=str, default=DEFAULT_CACHE_DIR)
+    p.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // 2**20, help='cache size limit in MB')
+    p.add_argument('--no-cache', action='store_true')
+    args = p.parse_args()
+
+    start = time.perf_counter()
+    results = compile_directory(args.directory, args.out, args.workers,
+                                None if args.no_cache else args.cache_dir, args.ext, args.cache_size * 2**20)
+    print_report(results, args.directory, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
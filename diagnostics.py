@@ -0,0 +1,69 @@
+"""
+Collect the errors of every compiler stage (lex, parse, semantic) for one
+source file, instead of stopping at the first one.
+
+A span is a (start, end) pair of character offsets into the source; line
+and column are computed from one table of line starts built on first use,
+so reporting N errors costs O(file + N log file), not O(N * file).
+"""
+
+from bisect import bisect_right
+
+
+class Diagnostic:
+    __slots__ = ("stage", "message", "span", "line", "column")
+
+    def __init__(self, stage, message, span, line, column):
+        self.stage = stage
+        self.message = message
+        self.span = span
+        self.line = line
+        self.column = column
+
+    def __str__(self):
+        where = f"line {self.line}, column {self.column}: " if self.line is not None else ""
+        return f"{where}{self.stage} error: {self.message}"
+
+    def __repr__(self):
+        return f"Diagnostic({self.stage!r}, {self.message!r}, span={self.span})"
+
+
+class Diagnostics:
+    """Errors of one source, in the order they were reported"""
+
+    def __init__(self, source=""):
+        self.source = source
+        self.items = []
+        self._line_starts = None
+
+    def error(self, stage, message, span=None):
+        line = column = None
+        if span is not None:
+            line, column = self.line_col(span[0])
+        self.items.append(Diagnostic(stage, message, span, line, column))
+
+    def line_col(self, offset):
+        """1-based (line, column) of a source offset"""
+        if self._line_starts is None:
+            starts = [0]
+            find = self.source.find
+            pos = find("\n")
+            while pos != -1:
+                starts.append(pos + 1)
+                pos = find("\n", pos + 1)
+            self._line_starts = starts
+        line = bisect_right(self._line_starts, offset)
+        return line, offset - self._line_starts[line - 1] + 1
+
+    def sorted(self):
+        """Diagnostics by position; ones without a span last"""
+        return sorted(self.items, key=lambda d: (d.span is None, d.span or (0, 0)))
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __str__(self):
+        return "\n".join(str(d) for d in self.sorted())
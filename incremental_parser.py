@@ -0,0 +1,159 @@
+"""
+Incremental re-lexing and re-parsing for the Semantic_analysis.py language.
+
+Every top-level statement ends with a SEMI token, or with the RBRACE of a
+{ } block, and right after it the lexer and the parser are both back in
+their start state. A Document therefore keeps, per top-level statement, its
+AST subtree and the offset just past its last token. After an edit
+(offset, deleted length, inserted text) it
+
+  1. re-lexes from the end of the last statement before the edit,
+  2. parses statements until one ends at an old statement boundary that
+     lies after the edit (shifted by the length change): from there on the
+     old tokens and subtrees are unchanged,
+  3. splices the new subtrees into the ("PROGRAM", statements) AST and
+     shifts the later boundaries.
+
+The cost per edit is the size of the damaged statements plus a shift of
+the boundary list, instead of a full lex + parse.
+
+Usage:
+  - python incremental_parser.py      # edit latency on a 100k-line file
+"""
+
+import bisect
+import random
+import time
+
+from Semantic_analysis import LEXER, Parser
+
+
+class Document:
+    def __init__(self, text):
+        self.text = text
+        self.statements = []    # AST subtree of every statement
+        self.ends = []          # offset just past the last token of every statement
+        self.valid = False
+        self._reparse_all()
+
+    @property
+    def ast(self):
+        if not self.valid:
+            raise SyntaxError("Document has syntax errors, fix them and edit again")
+        return ("PROGRAM", self.statements)
+
+    def _parse_from(self, start, resync=None):
+        """
+        Parse statements from offset start. resync(end) is asked after every
+        statement; when it returns an index the scan stops there.
+        Returns (statements, ends, resync_index or None).
+        """
+        statements, ends, tokens = [], [], []
+        depth = 0   # open { } blocks
+        for kind, value, _, end in LEXER.scan(self.text, start):
+            tokens.append((kind, value))
+            if kind == "LBRACE":
+                depth += 1
+                continue
+            if kind == "RBRACE":
+                depth -= 1
+            elif kind != "SEMI":
+                continue
+            if depth > 0:
+                continue
+            tokens.append(("EOF", None))
+            parser = Parser(tokens)
+            statements.append(parser.statement())
+            if parser.current_token[0] != "EOF":
+                raise SyntaxError(f"Unexpected token {parser.current_token}")
+            ends.append(end)
+            tokens = []
+            if resync is not None:
+                index = resync(end)
+                if index is not None:
+                    return statements, ends, index
+        if tokens:
+            raise SyntaxError(f"Incomplete statement at end of input: {tokens}")
+        return statements, ends, None
+
+    def _reparse_all(self):
+        self.valid = False
+        self.statements, self.ends, _ = self._parse_from(0)
+        self.valid = True
+
+    def edit(self, offset, deleted, inserted):
+        """Replace text[offset:offset + deleted] with inserted and update the AST"""
+        if not 0 <= offset <= offset + deleted <= len(self.text):
+            raise ValueError("Edit range outside the document")
+        self.text = self.text[:offset] + inserted + self.text[offset + deleted:]
+        if not self.valid:
+            self._reparse_all()
+            return self.ast
+
+        delta = len(inserted) - deleted
+        ends = self.ends
+        first = bisect.bisect_right(ends, offset)
+        start = ends[first - 1] if first else 0
+        edit_end = offset + len(inserted)
+
+        def resync(end):
+            # an old boundary after the edit: everything behind it is unchanged
+            if end < edit_end:
+                return None
+            old_end = end - delta
+            j = bisect.bisect_left(ends, old_end, first)
+            return j if j < len(ends) and ends[j] == old_end else None
+
+        try:
+            statements, new_ends, last = self._parse_from(start, resync)
+        except (SyntaxError, RuntimeError):
+            self.valid = False
+            raise
+
+        if last is None:
+            # parsed through to the end of the document
+            self.statements[first:] = statements
+            self.ends[first:] = new_ends
+        else:
+            self.statements[first:last + 1] = statements
+            tail = [end + delta for end in ends[last + 1:]] if delta else ends[last + 1:]
+            self.ends[first:] = new_ends + tail
+        return self.ast
+
+
+def benchmark_edits(lines=100_000, edits=200, seed=0):
+    """Average seconds per edit, incremental vs. full lex + parse"""
+    rng = random.Random(seed)
+    body = [f"int v{i};" if i % 3 == 0 else f"v{i - i % 3} = v{i - i % 3} + {i} * (v{i - i % 3} - 2);"
+            for i in range(lines)]
+    text = "\n".join(body) + "\n"
+
+    start = time.perf_counter()
+    doc = Document(text)
+    full = time.perf_counter() - start
+
+    total = 0.0
+    for _ in range(edits):
+        # retype a number inside a random assignment
+        line = rng.randrange(lines)
+        line += 1 if line % 3 == 0 else 0
+        line = min(line, lines - 1)
+        pos = doc.text.index("+ ", doc.ends[line - 1] if line else 0) + 2
+        start = time.perf_counter()
+        doc.edit(pos, 0, "1")
+        total += time.perf_counter() - start
+
+    assert doc.ast == Parser(LEXER.tokenize(doc.text)).parse()
+    return total / edits, full
+
+
+if __name__ == "__main__":
+    doc = Document("int x;\nint y;\nx = 5;\ny = x + 2;\n")
+    print(doc.ast)
+    doc.edit(doc.text.index("2;"), 1, "3 * x")     # y = x + 3 * x;
+    print(doc.ast)
+    doc.edit(0, 0, "float z;\n")
+    print(doc.ast)
+
+    per_edit, full = benchmark_edits()
+    print(f"\n100k lines: full lex + parse {full:.2f}s, incremental edit {per_edit * 1000:.2f} ms")
@@ -0,0 +1,82 @@
+import numpy as np
+
+from matrix_multiplication import classic_matrix_multiplication
+from sparse_matmul import DENSITY_THRESHOLD, auto_sparse_matmul, density, is_sparse
+from strassen import lookup_leaf_size, strassen_matrix_multiplication
+from strassian_matrix import strassen_matrix_mult
+
+# All matrix multiplication implementations of this repository behind one API
+METHODS = {
+    "classic": classic_matrix_multiplication,        # blocked O(n^3), any shape
+    "strassen": strassen_matrix_multiplication,      # square 2^n x 2^n only
+    "strassen_peel": strassen_matrix_mult,           # any shape (dynamic peeling)
+    "blas": np.matmul,
+    "sparse": auto_sparse_matmul,                    # CSR/CSC, or dense below DENSITY_THRESHOLD
+}
+
+
+def is_power_of_two(n):
+    return n > 0 and n & (n - 1) == 0
+
+
+def choose_method(A, B):
+    """
+    Pick the method "auto" would use for A @ B.
+    Sparse inputs, and dense ones with a measured density below
+    DENSITY_THRESHOLD, take the sparse path. Strassen only pays off once
+    the matrices are larger than the calibrated leaf size for their dtype
+    (see strassen.calibrate_leaf_size); without calibration data for this
+    machine, or for small or non-2-D inputs, plain BLAS is used.
+    """
+    if is_sparse(A) or is_sparse(B):
+        return "sparse"
+    if A.ndim != 2 or B.ndim != 2:
+        return "blas"
+    if min(density(A), density(B)) < DENSITY_THRESHOLD:
+        return "sparse"
+    leaf_size = lookup_leaf_size(np.result_type(A, B))
+    m, k = A.shape
+    n = B.shape[1]
+    if leaf_size is None or min(m, k, n) <= leaf_size:
+        return "blas"
+    if m == k == n and is_power_of_two(n):
+        return "strassen"
+    return "strassen_peel"
+
+
+def matmul(A, B, method="auto", **kwargs):
+    """
+    Multiply A and B with the given method ("auto", "classic", "strassen",
+    "strassen_peel", "blas" or "sparse"). Extra keyword arguments go to the
+    chosen implementation, e.g. leaf_size= or workers= for Strassen.
+    A and B may be CSRMatrix/CSCMatrix or scipy.sparse matrices.
+    """
+    if not is_sparse(A):
+        A = np.asarray(A)
+    if not is_sparse(B):
+        B = np.asarray(B)
+    if method == "auto":
+        method = choose_method(A, B)
+        if method not in ("blas", "sparse"):
+            kwargs.setdefault("leaf_size", lookup_leaf_size(np.result_type(A, B)))
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}, expected 'auto' or one of {sorted(METHODS)}")
+    if method != "sparse" and (is_sparse(A) or is_sparse(B)):
+        raise ValueError(f"method={method!r} needs dense inputs, use 'sparse' or 'auto'")
+    if method == "strassen" and not (A.shape == B.shape and A.shape[0] == A.shape[1]
+                                     and is_power_of_two(A.shape[0])):
+        raise ValueError("method='strassen' needs square 2^n x 2^n matrices, use 'strassen_peel'")
+    return METHODS[method](A, B, **kwargs)
+
+
+# Example usage
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    A = rng.random((300, 200))
+    B = rng.random((200, 500))
+    for method in ["auto"] + list(METHODS):
+        if method == "strassen":
+            continue
+        C = matmul(A, B, method=method)
+        print(f"{method:14s} max error vs np.matmul: {np.abs(C - A @ B).max():.2e}")
+    print("auto picks:", choose_method(A, B))
@@ -0,0 +1,115 @@
+"""
+Reproducible benchmark of the matrix multiplication implementations.
+
+Every (method, size) case runs in a fresh process so that its peak RSS is
+its own, on inputs drawn from a fixed seed. For each case the best of
+--repeats runs is reported as seconds and GFLOP/s (2 n^3 flops), together
+with the peak RSS and the max relative error against np.matmul.
+
+Usage:
+  - python matmul_benchmark.py --output bench.json
+  - python matmul_benchmark.py --sizes 64 256 1024 --methods blas strassen
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from matmul import METHODS, choose_method, is_power_of_two, matmul
+from strassen import DEFAULT_LEAF_SIZE, lookup_leaf_size, machine_key
+
+DEFAULT_SIZES = [64, 128, 256, 512, 1024, 2048, 4096]
+
+
+def run_case(method, n, dtype, repeats, seed=0):
+    rng = np.random.default_rng(seed)
+    A = (rng.random((n, n)) * 2 - 1).astype(dtype)
+    B = (rng.random((n, n)) * 2 - 1).astype(dtype)
+
+    if method == "auto":
+        chosen = choose_method(A, B)
+    else:
+        chosen = method
+    kwargs = {}
+    if method == "strassen":
+        # resolved once, outside the timed repeats (the only one with --repeats 1)
+        kwargs["leaf_size"] = lookup_leaf_size(dtype) or DEFAULT_LEAF_SIZE
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        C = matmul(A, B, method=method, **kwargs)
+        best = min(best, time.perf_counter() - start)
+
+    # peak RSS of the method under test, before the float64 reference adds its copies
+    # (ru_maxrss is in KiB on Linux and in bytes on macOS)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / 2**20 if sys.platform == "darwin" else rss / 2**10
+    reference = np.matmul(A.astype(np.float64), B.astype(np.float64))
+    error = float(np.abs(C - reference).max() / max(np.abs(reference).max(), 1e-300))
+
+    return {
+        "method": method,
+        "chosen": chosen,
+        "size": n,
+        "dtype": np.dtype(dtype).name,
+        "seconds": best,
+        "gflops": 2 * n**3 / best / 1e9,
+        "peak_rss_mb": rss_mb,
+        "max_rel_error": error,
+    }
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, methods=None, dtype="float64", repeats=3):
+    methods = methods or ["auto"] + list(METHODS)
+    cases = []
+    for n in sizes:
+        for method in methods:
+            if method == "strassen" and not is_power_of_two(n):
+                continue
+            cases.append((method, n))
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for method, n in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            row = pool.submit(run_case, method, n, dtype, repeats).result()
+        print(f"{method:14s} n={n:5d}  {row['seconds']:9.4f}s  {row['gflops']:8.2f} GFLOP/s  "
+              f"rss {row['peak_rss_mb']:8.1f} MB  err {row['max_rel_error']:.1e}")
+        results.append(row)
+
+    return {
+        "machine": machine_key(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "dtype": np.dtype(dtype).name,
+        "repeats": repeats,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    p.add_argument('--methods', nargs='+', choices=["auto"] + list(METHODS))
+    p.add_argument('--dtype', default='float64')
+    p.add_argument('--repeats', type=int, default=3)
+    p.add_argument('--output', type=str, default='matmul_benchmark.json', help='JSON report path')
+    args = p.parse_args()
+
+    report = run_benchmark(args.sizes, args.methods, args.dtype, args.repeats)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
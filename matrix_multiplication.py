@@ -1,31 +1,46 @@
 import numpy as np
 
-def classic_matrix_multiplication(A, B):
+def classic_matrix_multiplication(A, B, tile_rows=512, tile_cols=512):
     """
-    Normal matrix multiplication using triple loop
+    Normal (classic, O(n^3)) matrix multiplication, cache-blocked
     A: m x n matrix
     B: n x p matrix
-    Returns: m x p result matrix
+    Returns: m x p result matrix with the common dtype of A and B
+
+    C is processed in tiles of tile_rows x tile_cols, and each tile is
+    computed with one matmul call written straight into it:
+        C[i0:i1, j0:j1] = A[i0:i1, :] @ B[:, j0:j1]
+    so the O(n^3) inner work runs in NumPy's kernel (BLAS for float
+    dtypes), and Python only loops over the tiles.
     """
+    A = np.asarray(A)
+    B = np.asarray(B)
     m, n = A.shape
     nB, p = B.shape
 
     if n != nB:
         raise ValueError("Number of columns of A must match number of rows of B")
-
-    # Create a result matrix filled with zeros
-    C = np.zeros((m, p), dtype=int)
-
-    # Triple nested loop for multiplication
-    for i in range(m):
-        for j in range(p):
-            for k in range(n):
-                C[i][j] += A[i][k] * B[k][j]
+    if tile_rows < 1 or tile_cols < 1:
+        raise ValueError("Tile sizes must be positive")
+
+    dtype = np.result_type(A, B)
+    A = A.astype(dtype, copy=False)
+    B = B.astype(dtype, copy=False)
+    C = np.empty((m, p), dtype=dtype)
+
+    for i0 in range(0, m, tile_rows):
+        i1 = min(i0 + tile_rows, m)
+        A_rows = A[i0:i1]
+        for j0 in range(0, p, tile_cols):
+            j1 = min(j0 + tile_cols, p)
+            np.matmul(A_rows, B[:, j0:j1], out=C[i0:i1, j0:j1])
     return C
 
 
 # Example usage
 if __name__ == "__main__":
+    import time
+
     A = np.array([[1, 2], [3, 4]])
     B = np.array([[5, 6], [7, 8]])
 
@@ -33,4 +48,16 @@ if __name__ == "__main__":
     print("Matrix B:\n", B)
 
     C = classic_matrix_multiplication(A, B)
-    print("Result of Normal Matrix Multiplication:\n", C)
\ No newline at end of file
+    print("Result of Normal Matrix Multiplication:\n", C)
+
+    rng = np.random.default_rng(0)
+    X = rng.random((1000, 1000))
+    Y = rng.random((1000, 1000))
+    start = time.perf_counter()
+    Z = classic_matrix_multiplication(X, Y)
+    classic = time.perf_counter() - start
+    start = time.perf_counter()
+    np.dot(X, Y)
+    blas = time.perf_counter() - start
+    print(f"\n1000x1000: classic {classic:.3f}s, np.dot {blas:.3f}s "
+          f"({classic / blas:.1f}x), max error {np.abs(Z - X @ Y).max():.2e}")
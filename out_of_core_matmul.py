@@ -0,0 +1,130 @@
+"""
+Out-of-core matrix multiplication over memory-mapped .npy files.
+
+C = A @ B is computed one (tile x tile) block of C at a time:
+
+    for each row panel i of A:
+        for each column panel j of B:
+            C[i, j] = sum over k of A[i, k] @ B[k, j]
+
+Only three tiles (plus the accumulator) are in memory at once. Every tile of
+A is read ceil(n / tile) times and every tile of B ceil(m / tile) times.
+The finished blocks are flushed and recorded in a JSON checkpoint, so an
+interrupted run picks up where it stopped.
+
+Usage:
+  - python out_of_core_matmul.py A.npy B.npy C.npy --tile 4096
+  - re-run the same command after a crash to resume
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from matmul import matmul
+
+
+def tile_ranges(size, tile):
+    return [(start, min(start + tile, size)) for start in range(0, size, tile)]
+
+
+def load_checkpoint(path, signature):
+    """Return the set of finished (i, j) blocks recorded for this job"""
+    if path is None or not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("signature") != signature:
+        raise ValueError(f"Checkpoint {path} belongs to a different job, remove it to start over")
+    return {tuple(block) for block in data["done"]}
+
+
+def save_checkpoint(path, signature, done):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"signature": signature, "done": sorted(done)}, f)
+    os.replace(tmp_path, path)
+
+
+def out_of_core_matmul(A, B, out, tile=4096, method="auto", checkpoint=None, progress=None):
+    """
+    Multiply A (m x k) by B (k x n) into out (m x n) block by block.
+    A, B and out are usually np.memmap arrays; any array works.
+    checkpoint: path of a JSON file listing finished blocks (resume support)
+    progress: callable(done_blocks, total_blocks, seconds_elapsed)
+    """
+    m, k = A.shape
+    kB, n = B.shape
+    if k != kB:
+        raise ValueError("Number of columns of A must match number of rows of B")
+    if out.shape != (m, n):
+        raise ValueError(f"out must have shape {(m, n)}")
+
+    rows, inner, cols = tile_ranges(m, tile), tile_ranges(k, tile), tile_ranges(n, tile)
+    signature = {"A": [m, k], "B": [k, n], "tile": tile, "dtype": np.dtype(out.dtype).name}
+    done = load_checkpoint(checkpoint, signature)
+    total = len(rows) * len(cols)
+    start = time.perf_counter()
+
+    for bi, (i0, i1) in enumerate(rows):
+        for bj, (j0, j1) in enumerate(cols):
+            if (bi, bj) in done:
+                continue
+            acc = np.zeros((i1 - i0, j1 - j0), dtype=out.dtype)
+            for k0, k1 in inner:
+                # np.array copies the tile into memory, reading it from disk
+                # once; a memmap slice would be re-read page by page by matmul
+                a = np.array(A[i0:i1, k0:k1])
+                b = np.array(B[k0:k1, j0:j1])
+                acc += matmul(a, b, method=method)
+            out[i0:i1, j0:j1] = acc
+            if hasattr(out, "flush"):
+                out.flush()
+
+            done.add((bi, bj))
+            if checkpoint is not None:
+                save_checkpoint(checkpoint, signature, done)
+            if progress is not None:
+                progress(len(done), total, time.perf_counter() - start)
+    return out
+
+
+def print_progress(done, total, elapsed):
+    print(f"\r{done}/{total} blocks ({100 * done / total:.1f}%), {elapsed:.1f}s", end="", flush=True)
+    if done == total:
+        print()
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument('a', help='.npy file with A (m x k)')
+    p.add_argument('b', help='.npy file with B (k x n)')
+    p.add_argument('out', help='.npy file for C (m x n), created if missing')
+    p.add_argument('--tile', type=int, default=4096)
+    p.add_argument('--method', default='auto', help='tile multiply method, see matmul.METHODS')
+    p.add_argument('--checkpoint', help='checkpoint path (default: OUT.progress.json)')
+    args = p.parse_args()
+
+    A = np.load(args.a, mmap_mode="r")
+    B = np.load(args.b, mmap_mode="r")
+    checkpoint = args.checkpoint or args.out + ".progress.json"
+    shape = (A.shape[0], B.shape[1])
+    dtype = np.result_type(A.dtype, B.dtype)
+
+    if os.path.exists(args.out) and os.path.exists(checkpoint):
+        C = np.load(args.out, mmap_mode="r+")
+        print(f"Resuming {args.out} from {checkpoint}")
+    else:
+        C = np.lib.format.open_memmap(args.out, mode="w+", dtype=dtype, shape=shape)
+
+    out_of_core_matmul(A, B, C, tile=args.tile, method=args.method,
+                       checkpoint=checkpoint, progress=print_progress)
+    os.remove(checkpoint)
+    print(f"Saved {shape[0]}x{shape[1]} result to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
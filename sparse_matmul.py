@@ -0,0 +1,279 @@
+"""
+Sparse-aware matrix multiplication.
+
+CSRMatrix / CSCMatrix are small array-backed compressed formats (data,
+indices, indptr) with vectorized sparse @ dense and sparse @ sparse
+(Gustavson) products. When scipy is installed its compiled kernels are used
+for the heavy lifting and scipy.sparse matrices are accepted as inputs too.
+
+matmul.matmul(method="auto") sends sparse inputs here, and dense inputs whose
+measured density is below DENSITY_THRESHOLD.
+"""
+
+import numpy as np
+
+try:
+    import scipy.sparse as sp
+except ImportError:  # scipy is optional
+    sp = None
+
+# dense inputs with fewer nonzeros than this fraction take the sparse path
+DENSITY_THRESHOLD = 0.05
+# bound on the (nnz x n) temporary of the sparse @ dense kernel
+_CHUNK_ELEMENTS = 1 << 22
+
+
+class CSRMatrix:
+    """Compressed sparse row matrix: row i holds data[indptr[i]:indptr[i+1]]"""
+
+    def __init__(self, data, indices, indptr, shape):
+        self.data = np.asarray(data)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.shape = tuple(shape)
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    @classmethod
+    def from_dense(cls, A):
+        A = np.asarray(A)
+        rows, cols = np.nonzero(A)
+        indptr = np.zeros(A.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=A.shape[0]), out=indptr[1:])
+        return cls(A[rows, cols], cols, indptr, A.shape)
+
+    @classmethod
+    def from_coo(cls, rows, cols, values, shape):
+        """Build from coordinates; duplicate entries are summed"""
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        values = np.asarray(values)
+        keys = rows * shape[1] + cols
+        order = np.argsort(keys, kind="stable")
+        keys, values = keys[order], values[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else keys
+        values = np.add.reduceat(values, starts) if len(keys) else values
+        keys = keys[starts]
+        rows, cols = keys // shape[1], keys % shape[1]
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=shape[0]), out=indptr[1:])
+        return cls(values, cols, indptr, shape)
+
+    def row_indices(self):
+        """The row of every stored entry"""
+        return np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+
+    def to_dense(self):
+        C = np.zeros(self.shape, dtype=self.dtype)
+        C[self.row_indices(), self.indices] = self.data
+        return C
+
+    def to_csr(self):
+        return self
+
+    def to_scipy(self):
+        return sp.csr_matrix((self.data, self.indices, self.indptr), shape=self.shape)
+
+    def transpose(self):
+        """The transpose as a CSC matrix (same arrays, no copy)"""
+        return CSCMatrix(self.data, self.indices, self.indptr, self.shape[::-1])
+
+    @property
+    def T(self):
+        return self.transpose()
+
+    def __matmul__(self, other):
+        return sparse_matmul(self, other)
+
+    def __repr__(self):
+        return f"CSRMatrix(shape={self.shape}, nnz={self.nnz}, dtype={self.dtype})"
+
+
+class CSCMatrix:
+    """Compressed sparse column matrix: column j holds data[indptr[j]:indptr[j+1]]"""
+
+    def __init__(self, data, indices, indptr, shape):
+        self.data = np.asarray(data)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.shape = tuple(shape)
+
+    @property
+    def dtype(self):
+        return self.data.dtype
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    @classmethod
+    def from_dense(cls, A):
+        return CSRMatrix.from_dense(np.asarray(A).T).transpose()
+
+    def transpose(self):
+        return CSRMatrix(self.data, self.indices, self.indptr, self.shape[::-1])
+
+    @property
+    def T(self):
+        return self.transpose()
+
+    def to_csr(self):
+        cols = np.repeat(np.arange(self.shape[1]), np.diff(self.indptr))
+        return CSRMatrix.from_coo(self.indices, cols, self.data, self.shape)
+
+    def to_dense(self):
+        return self.transpose().to_dense().T
+
+    def __matmul__(self, other):
+        return sparse_matmul(self, other)
+
+    def __repr__(self):
+        return f"CSCMatrix(shape={self.shape}, nnz={self.nnz}, dtype={self.dtype})"
+
+
+def is_sparse(A):
+    return isinstance(A, (CSRMatrix, CSCMatrix)) or (sp is not None and sp.issparse(A))
+
+
+def density(A):
+    """Fraction of nonzero entries"""
+    if is_sparse(A):
+        size = A.shape[0] * A.shape[1]
+        return A.nnz / size if size else 0.0
+    A = np.asarray(A)
+    return np.count_nonzero(A) / A.size if A.size else 0.0
+
+
+def _csr_dense(A, B):
+    """CSR (m x k) @ dense (k x n): every stored entry scales one row of B"""
+    m = A.shape[0]
+    n = B.shape[1]
+    C = np.zeros((m, n), dtype=np.result_type(A.data, B))
+    rows_per_chunk = max(1, _CHUNK_ELEMENTS // max(n * max(A.nnz // max(m, 1), 1), 1))
+    for r0 in range(0, m, rows_per_chunk):
+        r1 = min(r0 + rows_per_chunk, m)
+        lo, hi = A.indptr[r0], A.indptr[r1]
+        if lo == hi:
+            continue
+        products = A.data[lo:hi, None] * B[A.indices[lo:hi]]
+        starts = A.indptr[r0:r1] - lo
+        nonempty = np.flatnonzero(np.diff(A.indptr[r0:r1 + 1]))
+        C[r0 + nonempty] = np.add.reduceat(products, starts[nonempty])
+    return C
+
+
+def _csr_csr(A, B):
+    """CSR @ CSR by Gustavson's row-wise expansion, summing duplicates"""
+    b_row_nnz = np.diff(B.indptr)
+    counts = b_row_nnz[A.indices]
+    total = int(counts.sum())
+    if total == 0:
+        return CSRMatrix(np.zeros(0, dtype=np.result_type(A.data, B.data)), [], np.zeros(A.shape[0] + 1),
+                         (A.shape[0], B.shape[1]))
+    # for the e-th entry (i, k) of A, pair it with every entry of row k of B
+    entry = np.repeat(np.arange(A.nnz), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    b_pos = B.indptr[A.indices[entry]] + offsets
+    rows = A.row_indices()[entry]
+    return CSRMatrix.from_coo(rows, B.indices[b_pos], A.data[entry] * B.data[b_pos],
+                              (A.shape[0], B.shape[1]))
+
+
+def _as_scipy(X):
+    if isinstance(X, CSRMatrix):
+        return X.to_scipy()
+    if isinstance(X, CSCMatrix):
+        return X.transpose().to_scipy().T
+    return X
+
+
+def sparse_matmul(A, B):
+    """
+    A @ B where A and/or B is sparse (CSRMatrix, CSCMatrix or scipy.sparse)
+    or a dense array. sparse @ sparse stays sparse (CSRMatrix, or scipy if
+    the inputs were scipy); any product with a dense operand is dense.
+    """
+    if A.shape[1] != B.shape[0]:
+        raise ValueError("Number of columns of A must match number of rows of B")
+    if sp is not None and (sp.issparse(A) or sp.issparse(B)):
+        A, B = _as_scipy(A), _as_scipy(B)
+        C = A @ B
+        return C.toarray() if sp.issparse(C) and not (sp.issparse(A) and sp.issparse(B)) else C
+
+    if isinstance(A, CSCMatrix):
+        A = A.to_csr()
+    if isinstance(B, CSCMatrix):
+        B = B.to_csr()
+    a_sparse, b_sparse = isinstance(A, CSRMatrix), isinstance(B, CSRMatrix)
+
+    if sp is not None:
+        # same formats, compiled kernels
+        A_s = A.to_scipy() if a_sparse else np.asarray(A)
+        B_s = B.to_scipy() if b_sparse else np.asarray(B)
+        if a_sparse and b_sparse:
+            C = (A_s @ B_s).tocsr()
+            C.sum_duplicates()
+            return CSRMatrix(C.data, C.indices, C.indptr, C.shape)
+        return np.asarray(A_s @ B_s)
+
+    if a_sparse and b_sparse:
+        return _csr_csr(A, B)
+    if a_sparse:
+        return _csr_dense(A, np.asarray(B))
+    # dense @ CSR == (CSR^T @ dense^T)^T, and CSR^T of B is B as CSC
+    return _csr_dense(B.transpose().to_csr(), np.asarray(A).T).T
+
+
+def sparse_from_dense(A):
+    """CSR copy of a dense matrix, as scipy.sparse if available"""
+    if sp is not None:
+        return sp.csr_matrix(A)
+    return CSRMatrix.from_dense(A)
+
+
+def auto_sparse_matmul(A, B, threshold=DENSITY_THRESHOLD):
+    """
+    A @ B with every dense operand sparser than threshold converted to CSR
+    first. If both inputs were dense the result is dense as well.
+    """
+    both_dense = not is_sparse(A) and not is_sparse(B)
+    if not is_sparse(A) and density(A) < threshold:
+        A = sparse_from_dense(A)
+    if not is_sparse(B) and density(B) < threshold:
+        B = sparse_from_dense(B)
+    if not is_sparse(A) and not is_sparse(B):
+        return np.asarray(A) @ np.asarray(B)
+
+    C = sparse_matmul(A, B)
+    if both_dense and is_sparse(C):
+        return C.toarray() if sp is not None and sp.issparse(C) else C.to_dense()
+    return C
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 2000
+    A = rng.random((n, n)) * (rng.random((n, n)) < 0.01)
+    B = rng.random((n, n)) * (rng.random((n, n)) < 0.01)
+    print(f"density A: {density(A):.3f}, B: {density(B):.3f}")
+
+    start = time.perf_counter()
+    dense = A @ B
+    print(f"dense  A @ B: {time.perf_counter() - start:.3f}s, {2 * A.nbytes / 2**20:.0f} MiB of inputs")
+
+    A_csr, B_csr = CSRMatrix.from_dense(A), CSRMatrix.from_dense(B)
+    start = time.perf_counter()
+    C = A_csr @ B_csr
+    elapsed = time.perf_counter() - start
+    size = sum(X.data.nbytes + X.indices.nbytes + X.indptr.nbytes for X in (A_csr, B_csr))
+    print(f"sparse A @ B: {elapsed:.3f}s, {size / 2**20:.1f} MiB of inputs, "
+          f"max error {np.abs(C.to_dense() - dense).max():.2e}")
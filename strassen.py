@@ -1,57 +1,415 @@
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from multiprocessing.shared_memory import SharedMemory
+
 import numpy as np
 
-def strassen_matrix_multiplication(A, B):
+# Below the leaf size the recursion hands the block to NumPy's matmul (BLAS).
+# The best crossover depends on dtype and machine: calibrate_leaf_size (or
+# --calibrate) measures it and stores it in a small JSON file keyed by machine
+# and dtype. Until then DEFAULT_LEAF_SIZE is used.
+DEFAULT_LEAF_SIZE = 128
+CALIBRATION_FILE = os.path.join(os.path.expanduser("~"), ".strassen_calibration.json")
+
+
+def machine_key():
+    """Identify the current machine for the calibration file"""
+    return f"{platform.node()}-{platform.machine()}-{os.cpu_count()}cpu-numpy{np.__version__}"
+
+
+def load_calibration(path=CALIBRATION_FILE):
+    """Return the saved calibration data, or an empty dict"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_calibration(data, path=CALIBRATION_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def calibrate_leaf_size(dtype=np.float64, size=512, candidates=None, repeats=3,
+                        path=CALIBRATION_FILE):
+    """
+    Time the hybrid algorithm on a size x size problem for every candidate
+    leaf size and store the fastest one for this machine and dtype.
+    A candidate equal to `size` means "plain matmul, no Strassen level at all".
+    """
+    dtype = np.dtype(dtype)
+    if candidates is None:
+        candidates = [c for c in (16, 32, 64, 128, 256, 512, 1024) if c <= size]
+        if size not in candidates:
+            candidates.append(size)
+
+    rng = np.random.default_rng(0)
+    A = (rng.random((size, size)) * 10).astype(dtype)
+    B = (rng.random((size, size)) * 10).astype(dtype)
+
+    timings = {}
+    for leaf in candidates:
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            strassen_matrix_multiplication(A, B, leaf_size=leaf)
+            best = min(best, time.perf_counter() - start)
+        timings[leaf] = best
+    leaf_size = min(timings, key=timings.get)
+
+    data = load_calibration(path)
+    entry = data.setdefault(machine_key(), {})
+    entry[dtype.name] = {
+        "leaf_size": leaf_size,
+        "size": size,
+        "timings": {str(k): v for k, v in timings.items()},
+    }
+    save_calibration(data, path)
+    return leaf_size
+
+
+def lookup_leaf_size(dtype=np.float64, path=CALIBRATION_FILE):
+    """The saved leaf size for dtype on this machine, or None if not calibrated"""
+    entry = load_calibration(path).get(machine_key(), {}).get(np.dtype(dtype).name)
+    return None if entry is None else entry["leaf_size"]
+
+
+def get_leaf_size(dtype=np.float64, path=CALIBRATION_FILE, calibrate=False):
+    """
+    Look up the calibrated leaf size for dtype on this machine.
+    If there is none yet, fall back to DEFAULT_LEAF_SIZE, or with
+    calibrate=True run the calibration (a few seconds) and save it.
+    """
+    leaf_size = lookup_leaf_size(dtype, path)
+    if leaf_size is not None:
+        return leaf_size
+    if calibrate:
+        try:
+            return calibrate_leaf_size(dtype, path=path)
+        except OSError:
+            pass
+    return DEFAULT_LEAF_SIZE
+
+
+class StrassenWorkspace:
+    """
+    Preallocated scratch buffers for the Strassen recursion.
+    Every recursion level needs one buffer for a sum of A quadrants, one for
+    a sum of B quadrants and one for the product M; the buffers of a level are
+    reused by all seven products, so the whole arena takes about n^2 elements
+    (3 * (n^2/4 + n^2/16 + ...)) no matter how deep the recursion goes.
+    """
+
+    def __init__(self, n, leaf_size, dtype):
+        self.n = n
+        self.leaf_size = leaf_size
+        self.dtype = np.dtype(dtype)
+        self.levels = []
+        size = n
+        while size > leaf_size:
+            half = size // 2
+            self.levels.append(tuple(np.empty((half, half), dtype=self.dtype) for _ in range(3)))
+            size = half
+
+    def fits(self, n, leaf_size, dtype):
+        return (self.n, self.leaf_size, self.dtype) == (n, leaf_size, np.dtype(dtype))
+
+
+def strassen_matrix_multiplication(A, B, leaf_size=None, out=None, workspace=None,
+                                   workers=1, parallel_depth=1, executor="thread"):
     """
     Strassen's Matrix Multiplication Algorithm
     A and B must be square matrices of size 2^n x 2^n
+    Blocks of size <= leaf_size are multiplied with NumPy's matmul; when
+    leaf_size is None the calibrated value for the result dtype is used, or
+    DEFAULT_LEAF_SIZE if there is none; a call never calibrates by itself.
+    The products and C quadrants are written into views of preallocated
+    buffers (`out` and a StrassenWorkspace), so no temporaries are created
+    inside the recursion. Pass the same workspace to repeated calls of the
+    same size to skip even the arena allocation.
+
+    With workers > 1 the top `parallel_depth` recursion levels are expanded
+    into 7**parallel_depth independent products that run concurrently:
+    executor="thread" uses a thread pool (NumPy releases the GIL inside
+    matmul and the ufuncs), executor="process" a process pool whose operands
+    and results live in one shared-memory block. An existing
+    ThreadPoolExecutor/ProcessPoolExecutor may be passed as executor as well.
     """
+    A = np.asarray(A)
+    B = np.asarray(B)
+    dtype = np.result_type(A, B)
+    A = A.astype(dtype, copy=False)
+    B = B.astype(dtype, copy=False)
+    n = len(A)
+    if leaf_size is None:
+        leaf_size = get_leaf_size(dtype)
+    leaf_size = max(int(leaf_size), 1)
+
+    if out is None:
+        out = np.empty((n, n), dtype=dtype)
+    elif out.shape != (n, n) or out.dtype != dtype:
+        raise ValueError(f"out must have shape {(n, n)} and dtype {dtype}")
+
+    if workers > 1 and parallel_depth > 0 and n > leaf_size:
+        # the parallel tasks bring their own buffers, no workspace needed
+        _parallel_strassen(A, B, out, leaf_size, workers, parallel_depth, executor)
+    else:
+        if workspace is None or not workspace.fits(n, leaf_size, dtype):
+            workspace = StrassenWorkspace(n, leaf_size, dtype)
+        _strassen_into(A, B, out, leaf_size, workspace.levels, 0)
+    return out
+
+
+def _strassen_into(A, B, C, leaf_size, levels, level):
     n = len(A)
-    
+
     # Base case
-    if n == 1:
-        return A * B
+    if n <= leaf_size:
+        np.matmul(A, B, out=C)
+        return
 
-    # Split matrices into quadrants
+    # Split matrices into quadrants (views, no copies)
     mid = n // 2
-    A11 = A[:mid, :mid]
-    A12 = A[:mid, mid:]
-    A21 = A[mid:, :mid]
-    A22 = A[mid:, mid:]
-    
-    B11 = B[:mid, :mid]
-    B12 = B[:mid, mid:]
-    B21 = B[mid:, :mid]
-    B22 = B[mid:, mid:]
-
-    # Calculate the 7 products (Strassen’s formulas)
-    M1 = strassen_matrix_multiplication(A11 + A22, B11 + B22)
-    M2 = strassen_matrix_multiplication(A21 + A22, B11)
-    M3 = strassen_matrix_multiplication(A11, B12 - B22)
-    M4 = strassen_matrix_multiplication(A22, B21 - B11)
-    M5 = strassen_matrix_multiplication(A11 + A12, B22)
-    M6 = strassen_matrix_multiplication(A21 - A11, B11 + B12)
-    M7 = strassen_matrix_multiplication(A12 - A22, B21 + B22)
-
-    # Combine results into final matrix
-    C11 = M1 + M4 - M5 + M7
-    C12 = M3 + M5
-    C21 = M2 + M4
-    C22 = M1 - M2 + M3 + M6
-
-    # Join the quadrants into a single matrix
-    top = np.hstack((C11, C12))
-    bottom = np.hstack((C21, C22))
-    C = np.vstack((top, bottom))
+    A11, A12, A21, A22 = A[:mid, :mid], A[:mid, mid:], A[mid:, :mid], A[mid:, mid:]
+    B11, B12, B21, B22 = B[:mid, :mid], B[:mid, mid:], B[mid:, :mid], B[mid:, mid:]
+    C11, C12, C21, C22 = C[:mid, :mid], C[:mid, mid:], C[mid:, :mid], C[mid:, mid:]
+    TA, TB, M = levels[level]
+    level += 1
+
+    # Accumulate the 7 products (Strassen’s formulas) straight into C:
+    #   C11 = M1 + M4 - M5 + M7    C12 = M3 + M5
+    #   C21 = M2 + M4              C22 = M1 - M2 + M3 + M6
+    # M1 = (A11 + A22)(B11 + B22)
+    np.add(A11, A22, out=TA)
+    np.add(B11, B22, out=TB)
+    _strassen_into(TA, TB, C11, leaf_size, levels, level)
+    np.copyto(C22, C11)
+    # M2 = (A21 + A22) B11
+    np.add(A21, A22, out=TA)
+    _strassen_into(TA, B11, C21, leaf_size, levels, level)
+    np.subtract(C22, C21, out=C22)
+    # M3 = A11 (B12 - B22)
+    np.subtract(B12, B22, out=TB)
+    _strassen_into(A11, TB, C12, leaf_size, levels, level)
+    np.add(C22, C12, out=C22)
+    # M4 = A22 (B21 - B11)
+    np.subtract(B21, B11, out=TB)
+    _strassen_into(A22, TB, M, leaf_size, levels, level)
+    np.add(C11, M, out=C11)
+    np.add(C21, M, out=C21)
+    # M5 = (A11 + A12) B22
+    np.add(A11, A12, out=TA)
+    _strassen_into(TA, B22, M, leaf_size, levels, level)
+    np.subtract(C11, M, out=C11)
+    np.add(C12, M, out=C12)
+    # M6 = (A21 - A11)(B11 + B12)
+    np.subtract(A21, A11, out=TA)
+    np.add(B11, B12, out=TB)
+    _strassen_into(TA, TB, M, leaf_size, levels, level)
+    np.add(C22, M, out=C22)
+    # M7 = (A12 - A22)(B21 + B22)
+    np.subtract(A12, A22, out=TA)
+    np.add(B21, B22, out=TB)
+    _strassen_into(TA, TB, M, leaf_size, levels, level)
+    np.add(C11, M, out=C11)
+
+
+# ---------------- Parallel fan-out ----------------
+def _strassen_operands(A, B):
+    """The seven (left, right) operand pairs of one Strassen level"""
+    mid = len(A) // 2
+    A11, A12, A21, A22 = A[:mid, :mid], A[:mid, mid:], A[mid:, :mid], A[mid:, mid:]
+    B11, B12, B21, B22 = B[:mid, :mid], B[:mid, mid:], B[mid:, :mid], B[mid:, mid:]
+    return [
+        (A11 + A22, B11 + B22),
+        (A21 + A22, B11),
+        (A11, B12 - B22),
+        (A22, B21 - B11),
+        (A11 + A12, B22),
+        (A21 - A11, B11 + B12),
+        (A12 - A22, B21 + B22),
+    ]
+
+
+def _split_tasks(A, B, depth, leaf_size, tasks):
+    """
+    Expand the top `depth` levels into independent products appended to
+    tasks. Returns the product tree: a task index for a leaf, or a list
+    of seven subtrees for an expanded level.
+    """
+    if depth == 0 or len(A) <= leaf_size:
+        tasks.append((A, B))
+        return len(tasks) - 1
+    return [_split_tasks(X, Y, depth - 1, leaf_size, tasks) for X, Y in _strassen_operands(A, B)]
+
+
+def _assemble(tree, products, C):
+    """Combine the finished products of a tree into C"""
+    if isinstance(tree, int):
+        np.copyto(C, products[tree])
+        return C
+    half = len(C) // 2
+    M1, M2, M3, M4, M5, M6, M7 = [
+        products[t] if isinstance(t, int) else _assemble(t, products, np.empty((half, half), dtype=C.dtype))
+        for t in tree
+    ]
+    C11, C12, C21, C22 = C[:half, :half], C[:half, half:], C[half:, :half], C[half:, half:]
+    np.add(M1, M4, out=C11)
+    np.subtract(C11, M5, out=C11)
+    np.add(C11, M7, out=C11)
+    np.add(M3, M5, out=C12)
+    np.add(M2, M4, out=C21)
+    np.subtract(M1, M2, out=C22)
+    np.add(C22, M3, out=C22)
+    np.add(C22, M6, out=C22)
     return C
 
 
+def _thread_task(task, leaf_size):
+    X, Y = task
+    return strassen_matrix_multiplication(X, Y, leaf_size=leaf_size)
+
+
+def _shared_memory_task(name, shape, dtype, index, leaf_size):
+    # Runs in a worker process: operands and result are slots of the shared block
+    shm = SharedMemory(name=name)
+    try:
+        block = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        strassen_matrix_multiplication(block[index, 0], block[index, 1],
+                                       leaf_size=leaf_size, out=block[index, 2])
+        del block
+    finally:
+        shm.close()
+
+
+def _run_in_processes(tasks, tree, C, leaf_size, pool):
+    half = len(tasks[0][0])
+    shape = (len(tasks), 3, half, half)
+    shm = SharedMemory(create=True, size=int(np.prod(shape)) * C.dtype.itemsize)
+    try:
+        block = np.ndarray(shape, dtype=C.dtype, buffer=shm.buf)
+        for i, (X, Y) in enumerate(tasks):
+            block[i, 0] = X
+            block[i, 1] = Y
+        tasks.clear()
+        futures = [pool.submit(_shared_memory_task, shm.name, shape, C.dtype.str, i, leaf_size)
+                   for i in range(shape[0])]
+        for future in futures:
+            future.result()
+        _assemble(tree, block[:, 2], C)
+        del block
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _parallel_strassen(A, B, C, leaf_size, workers, parallel_depth, executor):
+    tasks = []
+    tree = _split_tasks(A, B, parallel_depth, leaf_size, tasks)
+
+    if isinstance(executor, Executor):
+        pool, owned = executor, False
+    elif executor == "thread":
+        pool, owned = ThreadPoolExecutor(max_workers=workers), True
+    elif executor == "process":
+        pool, owned = ProcessPoolExecutor(max_workers=workers), True
+    else:
+        raise ValueError(f"Unknown executor {executor!r}, expected 'thread' or 'process'")
+
+    try:
+        if isinstance(pool, ProcessPoolExecutor):
+            _run_in_processes(tasks, tree, C, leaf_size, pool)
+        else:
+            products = list(pool.map(partial(_thread_task, leaf_size=leaf_size), tasks))
+            _assemble(tree, products, C)
+    finally:
+        if owned:
+            pool.shutdown()
+
+
+def benchmark_scaling(n=2048, worker_counts=(1, 2, 4, 8, 16), executor="thread",
+                      parallel_depth=2, leaf_size=None, repeats=3):
+    """Best-of-`repeats` wall time and speedup over the first worker count"""
+    rng = np.random.default_rng(0)
+    A = rng.random((n, n))
+    B = rng.random((n, n))
+    if leaf_size is None:
+        leaf_size = get_leaf_size(A.dtype)
+
+    rows = []
+    for workers in worker_counts:
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            strassen_matrix_multiplication(A, B, leaf_size=leaf_size, workers=workers,
+                                           parallel_depth=parallel_depth, executor=executor)
+            best = min(best, time.perf_counter() - start)
+        rows.append({"workers": workers, "seconds": best, "speedup": rows[0]["seconds"] / best if rows else 1.0})
+    return rows
+
+
+def peak_memory(func, *args, **kwargs):
+    """Run func and return (result, peak traced NumPy allocation in bytes)"""
+    tracemalloc.start()
+    try:
+        result = func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
 # Example usage
 if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument('--scaling', action='store_true', help='run the 1-16 worker scaling benchmark')
+    p.add_argument('--size', type=int, default=2048)
+    p.add_argument('--executor', choices=['thread', 'process'], default='thread')
+    p.add_argument('--depth', type=int, default=2, help='parallel fan-out depth')
+    p.add_argument('--calibrate', action='store_true',
+                   help=f'measure the best leaf size for float64 and save it to {CALIBRATION_FILE}')
+    args = p.parse_args()
+
+    if args.calibrate:
+        print(f"Calibrated float64 leaf size: {calibrate_leaf_size(np.float64)}")
+
+    if args.scaling:
+        print(f"Scaling, {args.size}x{args.size}, {args.executor} pool, depth {args.depth}:")
+        for row in benchmark_scaling(args.size, executor=args.executor, parallel_depth=args.depth):
+            print(f"  {row['workers']:2d} workers: {row['seconds']:.3f}s  speedup {row['speedup']:.2f}x")
+        raise SystemExit
+
     A = np.array([[1, 2], [3, 4]])
     B = np.array([[5, 6], [7, 8]])
 
     print("Matrix A:\n", A)
     print("Matrix B:\n", B)
 
-    C = strassen_matrix_multiplication(A, B)
-    print("Result of Strassen Matrix Multiplication:\n", C)
\ No newline at end of file
+    C = strassen_matrix_multiplication(A, B, leaf_size=1)
+    print("Result of Strassen Matrix Multiplication:\n", C)
+
+    # Hybrid engine on a larger problem, with the calibrated leaf size if there is one
+    rng = np.random.default_rng(1)
+    X = rng.random((1024, 1024))
+    Y = rng.random((1024, 1024))
+    leaf = get_leaf_size(X.dtype)
+    start = time.perf_counter()
+    Z = strassen_matrix_multiplication(X, Y, leaf_size=leaf)
+    elapsed = time.perf_counter() - start
+    print(f"\n1024x1024 with leaf size {leaf}: {elapsed:.3f}s, "
+          f"max error vs A @ B: {np.abs(Z - X @ Y).max():.2e}")
+
+    # Peak memory of a 2048x2048 multiply (the result itself is 32 MiB)
+    X = rng.random((2048, 2048))
+    Y = rng.random((2048, 2048))
+    _, peak = peak_memory(strassen_matrix_multiplication, X, Y, leaf_size=64)
+    print(f"2048x2048 peak allocation: {peak / 2**20:.1f} MiB")
@@ -1,45 +1,119 @@
 import numpy as np
 
-def strassen_matrix_mult(A, B):
+def strassen_matrix_mult(A, B, leaf_size=64):
     """
-    Perform Strassen's matrix multiplication on square matrices A and B.
-    Both A and B must be numpy arrays of shape (n, n) where n is a power of 2.
+    Perform Strassen's matrix multiplication on A (m x k) and B (k x n).
+    Any shape is accepted: odd dimensions are handled by dynamic peeling
+    (the last row/column is split off and fixed up with a matrix-vector
+    product or rank-1 update) instead of padding to the next power of two.
+    Blocks with a dimension <= leaf_size are multiplied with np.matmul.
+
+    Accuracy: integer inputs give exactly np.matmul's result (as long as the
+    intermediate sums do not overflow the dtype). For floating point inputs
+    Strassen's error bound is weaker than the classic one; the result matches
+    np.matmul to within
+        abs(C - A @ B) <= 1e-12 * k * max|A| * max|B|    (float64)
+        abs(C - A @ B) <= 1e-4  * k * max|A| * max|B|    (float32)
+    """
+    A = np.asarray(A)
+    B = np.asarray(B)
+    if A.ndim != 2 or B.ndim != 2:
+        raise ValueError("A and B must be 2-D matrices")
+    if A.shape[1] != B.shape[0]:
+        raise ValueError("Number of columns of A must match number of rows of B")
+    return _strassen_peel(A, B, max(int(leaf_size), 1))
+
+
+def strassen_matrix_mult_batched(A, B, leaf_size=16, chunk_size=128):
     """
-    n = A.shape[0]
+    Strassen's multiplication of stacks of matrices: A has shape (batch, m, k)
+    and B (batch, k, n); either may also be a single 2-D matrix that is
+    broadcast over the batch.
+    Every recursion step (split, the 7 products, the recombination) is done
+    for a whole chunk of the batch at once with broadcasting, so the Python
+    overhead is paid once per recursion level and chunk instead of once per
+    matrix pair. chunk_size keeps the temporaries of a chunk cache-sized.
+    """
+    A = np.asarray(A)
+    B = np.asarray(B)
+    if A.ndim not in (2, 3) or B.ndim not in (2, 3):
+        raise ValueError("A and B must be (batch, m, k) and (batch, k, n) stacks")
+    if A.shape[-1] != B.shape[-2]:
+        raise ValueError("Number of columns of A must match number of rows of B")
+    leaf_size = max(int(leaf_size), 1)
+    batch = np.broadcast_shapes(A.shape[:-2], B.shape[:-2])
+    if not batch:
+        return _strassen_peel(A, B, leaf_size)
+
+    C = np.empty(batch + (A.shape[-2], B.shape[-1]), dtype=np.result_type(A, B))
+    for start in range(0, batch[0], chunk_size):
+        stop = start + chunk_size
+        # a 2-D operand or a batch of 1 is broadcast, not sliced
+        A_chunk = A[start:stop] if A.ndim == 3 and A.shape[0] != 1 else A
+        B_chunk = B[start:stop] if B.ndim == 3 and B.shape[0] != 1 else B
+        C[start:stop] = _strassen_peel(A_chunk, B_chunk, leaf_size)
+    return C
+
+
+# The helpers below index with [..., rows, cols] so they work unchanged on
+# single matrices and on stacks of matrices.
+def _strassen_peel(A, B, leaf_size):
+    m, k = A.shape[-2:]
+    n = B.shape[-1]
 
-    # Base case: 1x1 matrix
-    if n == 1:
-        return A * B
+    # Base case: small block, let BLAS do it
+    if min(m, k, n) <= leaf_size:
+        return A @ B
 
-    # Divide matrices into quadrants
-    k = n // 2
-    A11, A12, A21, A22 = A[:k, :k], A[:k, k:], A[k:, :k], A[k:, k:]
-    B11, B12, B21, B22 = B[:k, :k], B[:k, k:], B[k:, :k], B[k:, k:]
+    # Dynamic peeling: work on the largest even-sized core and fix up
+    # the odd row/column afterwards
+    me, ke, ne = m - m % 2, k - k % 2, n - n % 2
+    if (me, ke, ne) == (m, k, n):
+        return _strassen_even(A, B, leaf_size)
+
+    batch = np.broadcast_shapes(A.shape[:-2], B.shape[:-2])
+    C = np.empty(batch + (m, n), dtype=np.result_type(A, B))
+    C[..., :me, :ne] = _strassen_even(A[..., :me, :ke], B[..., :ke, :ne], leaf_size)
+    if ke != k:
+        # rank-1 update for the peeled column of A / row of B
+        C[..., :me, :ne] += A[..., :me, ke, None] * B[..., ke, None, :ne]
+    if ne != n:
+        C[..., :me, ne:] = A[..., :me, :] @ B[..., ne:]
+    if me != m:
+        C[..., me:, :] = A[..., me:, :] @ B
+    return C
+
+
+def _strassen_even(A, B, leaf_size):
+    # Divide matrices into quadrants (m, k and n are all even here)
+    m2, k2 = A.shape[-2] // 2, A.shape[-1] // 2
+    n2 = B.shape[-1] // 2
+    A11, A12 = A[..., :m2, :k2], A[..., :m2, k2:]
+    A21, A22 = A[..., m2:, :k2], A[..., m2:, k2:]
+    B11, B12 = B[..., :k2, :n2], B[..., :k2, n2:]
+    B21, B22 = B[..., k2:, :n2], B[..., k2:, n2:]
 
     # Compute the 7 products using Strassen's formula
-    M1 = strassen_matrix_mult(A11 + A22, B11 + B22)
-    M2 = strassen_matrix_mult(A21 + A22, B11)
-    M3 = strassen_matrix_mult(A11, B12 - B22)
-    M4 = strassen_matrix_mult(A22, B21 - B11)
-    M5 = strassen_matrix_mult(A11 + A12, B22)
-    M6 = strassen_matrix_mult(A21 - A11, B11 + B12)
-    M7 = strassen_matrix_mult(A12 - A22, B21 + B22)
+    M1 = _strassen_peel(A11 + A22, B11 + B22, leaf_size)
+    M2 = _strassen_peel(A21 + A22, B11, leaf_size)
+    M3 = _strassen_peel(A11, B12 - B22, leaf_size)
+    M4 = _strassen_peel(A22, B21 - B11, leaf_size)
+    M5 = _strassen_peel(A11 + A12, B22, leaf_size)
+    M6 = _strassen_peel(A21 - A11, B11 + B12, leaf_size)
+    M7 = _strassen_peel(A12 - A22, B21 + B22, leaf_size)
 
     # Combine results into final quadrants
-    C11 = M1 + M4 - M5 + M7
-    C12 = M3 + M5
-    C21 = M2 + M4
-    C22 = M1 - M2 + M3 + M6
-
-    # Merge quadrants into a single matrix
-    top = np.hstack((C11, C12))
-    bottom = np.hstack((C21, C22))
-    return np.vstack((top, bottom))
+    C = np.empty(M1.shape[:-2] + (2 * m2, 2 * n2), dtype=M1.dtype)
+    C[..., :m2, :n2] = M1 + M4 - M5 + M7
+    C[..., :m2, n2:] = M3 + M5
+    C[..., m2:, :n2] = M2 + M4
+    C[..., m2:, n2:] = M1 - M2 + M3 + M6
+    return C
 
 
 # Example usage
 if __name__ == "__main__":
-    # Example: 4x4 matrices (size must be power of 2)
+    # Example: 4x4 matrices
     A = np.array([[1, 2, 3, 4],
                   [5, 6, 7, 8],
                   [9, 10, 11, 12],
@@ -55,6 +129,36 @@ if __name__ == "__main__":
     print("\nMatrix B:")
     print(B)
 
-    C = strassen_matrix_mult(A, B)
+    C = strassen_matrix_mult(A, B, leaf_size=1)
     print("\nStrassen Matrix Multiplication Result:")
-    print(C)
\ No newline at end of file
+    print(C)
+
+    # Rectangular, non-power-of-two shapes go through the same fast path
+    rng = np.random.default_rng(0)
+    X = rng.random((1000, 700))
+    Y = rng.random((700, 1001))
+    Z = strassen_matrix_mult(X, Y)
+    bound = 1e-12 * X.shape[1] * np.abs(X).max() * np.abs(Y).max()
+    print(f"\n(1000x700) @ (700x1001): max error {np.abs(Z - X @ Y).max():.2e} "
+          f"(documented bound {bound:.2e})")
+
+    # A stack of small matrices in one call instead of a Python loop
+    import time
+    X = rng.random((20000, 48, 48))
+    Y = rng.random((20000, 48, 48))
+    start = time.perf_counter()
+    Z = strassen_matrix_mult_batched(X, Y, leaf_size=24)
+    batched = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(len(X)):
+        strassen_matrix_mult(X[i], Y[i], leaf_size=24)
+    looped = time.perf_counter() - start
+    print(f"20000 x (48x48): batched {batched:.3f}s, one call per pair {looped:.3f}s, "
+          f"max error {np.abs(Z - X @ Y).max():.2e}")
+
+    # A batch of 1 broadcasts against a larger batch, across chunks too
+    X1 = rng.random((1, 6, 6))
+    Y = rng.random((20, 6, 6))
+    Z = strassen_matrix_mult_batched(X1, Y, leaf_size=2, chunk_size=7)
+    assert np.allclose(Z, X1 @ Y), "broadcast batch of 1 gave a wrong product"
+    print("(1, 6, 6) @ (20, 6, 6) in chunks of 7: ok")
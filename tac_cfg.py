@@ -0,0 +1,523 @@
+"""
+Basic blocks, control-flow graph and SSA form for tac_ir instructions.
+
+build_cfg() splits a list of Instructions into BasicBlocks: a block starts
+at a label or after a jump, and holds its label, straight-line body and
+terminator (goto / if, or None to fall through). Blocks are kept in program
+order, so CFG.instructions() gives back equivalent linear code.
+
+On top of the graph:
+
+  - dominators()              Cooper, Harvey & Kennedy, "A Simple, Fast
+                              Dominance Algorithm": iterate over reverse
+                              postorder, intersecting along idom chains
+  - dominance_frontiers()     walk up from each predecessor of a join block
+  - liveness()                backward worklist over the blocks, phi
+                              arguments read on their incoming edges
+  - to_ssa()                  semi-pruned phi insertion on the iterated
+                              dominance frontier, then renaming in one walk
+                              over the dominator tree
+
+Every walk uses an explicit stack, and no pass compares all pairs of blocks
+or names, so a million instructions take seconds, not hours.
+
+Usage:
+  - python tac_cfg.py                 # example, then timings up to 1M instructions
+"""
+
+from tac_ir import GOTO, IF, LABEL, PHI, Instruction, is_temp, parse_tac, temp_name
+
+
+class BasicBlock:
+    __slots__ = ("index", "label", "phis", "body", "terminator", "preds", "succs")
+
+    def __init__(self, index, label=None):
+        self.index = index
+        self.label = label          # name of the label starting the block, or None
+        self.phis = []              # PHI instructions, only in SSA form
+        self.body = []              # copies and binary operations
+        self.terminator = None      # GOTO or IF instruction, or None
+        self.preds = []             # block indexes, in phi argument order
+        self.succs = []
+
+    def instructions(self):
+        if self.label is not None:
+            yield Instruction(None, LABEL, (self.label,))
+        yield from self.phis
+        yield from self.body
+        if self.terminator is not None:
+            yield self.terminator
+
+    def __repr__(self):
+        return f"BasicBlock({self.index}, {self.label!r}, {len(self.body)} instructions, succs={self.succs})"
+
+
+class CFG:
+    def __init__(self, blocks):
+        # blocks[0] is the entry; exits are the blocks that can end the program
+        self.blocks = blocks
+        self.exits = []
+        # True after to_ssa() or for parsed code with phis: backends that
+        # need plain names check it instead of misreading x#1 as a variable
+        self.ssa = any(block.phis for block in blocks)
+        self._connect()
+
+    def _connect(self):
+        blocks = self.blocks
+        targets = {block.label: block.index for block in blocks if block.label is not None}
+        for block in blocks:
+            block.preds = []
+        for block in blocks:
+            succs = []
+            terminator = block.terminator
+            if terminator is not None:
+                label = terminator.args[-1]
+                if label not in targets:
+                    raise ValueError(f"Jump to undefined label {label!r}")
+                succs.append(targets[label])
+            if terminator is None or terminator.op == IF:
+                if block.index + 1 < len(blocks):
+                    if block.index + 1 not in succs:
+                        succs.append(block.index + 1)
+                else:
+                    self.exits.append(block.index)
+            block.succs = succs
+            for s in succs:
+                blocks[s].preds.append(block.index)
+
+    def instructions(self):
+        """Linear code for the blocks, in program order"""
+        return [ins for block in self.blocks for ins in block.instructions()]
+
+    def __len__(self):
+        return len(self.blocks)
+
+    # ---------------- Dominance ----------------
+    def reverse_postorder(self):
+        """Indexes of the blocks reachable from the entry, in reverse postorder"""
+        blocks = self.blocks
+        if not blocks:
+            return []
+        seen = [False] * len(blocks)
+        seen[0] = True
+        order = []
+        stack = [(0, iter(blocks[0].succs))]
+        while stack:
+            index, succs = stack[-1]
+            for s in succs:
+                if not seen[s]:
+                    seen[s] = True
+                    stack.append((s, iter(blocks[s].succs)))
+                    break
+            else:
+                stack.pop()
+                order.append(index)
+        order.reverse()
+        return order
+
+    def dominators(self):
+        """idom[b]: immediate dominator of block b (the entry's is itself, None if unreachable)"""
+        blocks = self.blocks
+        order = self.reverse_postorder()
+        rank = [-1] * len(blocks)
+        for i, b in enumerate(order):
+            rank[b] = i
+        idom = [None] * len(blocks)
+        if not order:
+            return idom
+        idom[0] = 0
+        changed = True
+        while changed:
+            changed = False
+            for b in order[1:]:
+                new = None
+                for p in blocks[b].preds:
+                    if idom[p] is None:
+                        continue
+                    if new is None:
+                        new = p
+                        continue
+                    # intersect: walk the deeper finger up until both meet
+                    x, y = p, new
+                    while x != y:
+                        while rank[x] > rank[y]:
+                            x = idom[x]
+                        while rank[y] > rank[x]:
+                            y = idom[y]
+                    new = x
+                if idom[b] != new:
+                    idom[b] = new
+                    changed = True
+        return idom
+
+    def dominator_tree(self, idom=None):
+        """children[b]: blocks immediately dominated by b"""
+        if idom is None:
+            idom = self.dominators()
+        children = [[] for _ in self.blocks]
+        for b, d in enumerate(idom):
+            if d is not None and d != b:
+                children[d].append(b)
+        return children
+
+    def dominance_frontiers(self, idom=None):
+        """frontier[b]: set of blocks where b's dominance ends"""
+        if idom is None:
+            idom = self.dominators()
+        frontier = [set() for _ in self.blocks]
+        for block in self.blocks:
+            b = block.index
+            if len(block.preds) < 2 or idom[b] is None:
+                continue
+            for runner in block.preds:
+                if idom[runner] is None:
+                    continue
+                while runner != idom[b]:
+                    frontier[runner].add(b)
+                    runner = idom[runner]
+        return frontier
+
+    # ---------------- Liveness ----------------
+    def exit_live(self):
+        """
+        Names live when the program ends: every variable that is not a
+        temporary. In SSA form that is the version of each variable current
+        at the exit, found walking up the dominator tree from the exit
+        block, or the plain name if no assignment dominates the exit.
+        """
+        names = set()
+        for block in self.blocks:
+            for ins in block.body:
+                if not is_temp(ins.dest):
+                    names.add(ins.dest)
+        if not self.ssa:
+            return names
+        for block in self.blocks:
+            names.update(phi.dest for phi in block.phis if not is_temp(phi.dest))
+        variables = {unversioned(name) for name in names}
+        live = set()
+        idom = self.dominators()
+        for b in self.exits:
+            found = set()
+            while True:
+                block = self.blocks[b]
+                for ins in reversed(block.phis + block.body):
+                    variable = unversioned(ins.dest)
+                    if variable in variables and variable not in found:
+                        found.add(variable)
+                        live.add(ins.dest)
+                if idom[b] is None or idom[b] == b:
+                    break
+                b = idom[b]
+            live.update(variables - found)
+        return live
+
+    def liveness(self, exit_live=None):
+        """
+        (live_in, live_out): per block, the sets of names that may be read
+        before they are assigned again. A phi is read on the edges into its
+        block: its j-th argument is live out of the j-th predecessor.
+        """
+        blocks = self.blocks
+        if exit_live is None:
+            exit_live = self.exit_live()
+        uses, defs = [], []
+        for block in blocks:
+            used, defined = set(), set()
+            for phi in block.phis:
+                defined.add(phi.dest)
+            for ins in block.body:
+                for name in ins.uses():
+                    if name not in defined:
+                        used.add(name)
+                defined.add(ins.dest)
+            if block.terminator is not None:
+                used.update(name for name in block.terminator.uses() if name not in defined)
+            uses.append(used)
+            defs.append(defined)
+
+        live_in = [set() for _ in blocks]
+        live_out = [set() for _ in blocks]
+        for b in self.exits:
+            live_out[b] = set(exit_live)
+        for block in blocks:
+            for phi in block.phis:
+                for p, a in zip(block.preds, phi.args):
+                    if type(a) is str:
+                        live_out[p].add(a)
+        for b in range(len(blocks)):
+            live_in[b] = uses[b] | (live_out[b] - defs[b])
+        # postorder visits successors first, so most blocks settle in one pass
+        pending = [True] * len(blocks)
+        worklist = list(range(len(blocks)))
+        while worklist:
+            b = worklist.pop()
+            pending[b] = False
+            for p in blocks[b].preds:
+                added = live_in[b] - live_out[p]
+                if added:
+                    live_out[p] |= added
+                    added -= defs[p]
+                    added -= live_in[p]
+                    if added:
+                        live_in[p] |= added
+                        if not pending[p]:
+                            pending[p] = True
+                            worklist.append(p)
+        return live_in, live_out
+
+    # ---------------- SSA ----------------
+    def to_ssa(self):
+        """
+        Rewrite the blocks into SSA form in place: every assignment gets a
+        new name x#1, x#2, ... and joins get phi instructions. Reads of a
+        name that is not assigned on the way keep the plain name. Unreachable
+        blocks are left as they are. Variables (not temporaries) get phis
+        wherever their assignments meet, as they are read at the exit.
+        """
+        blocks = self.blocks
+        idom = self.dominators()
+        frontier = self.dominance_frontiers(idom)
+
+        # semi-pruned: only names read in a block other than the one
+        # assigning them need phis, counting the exit's read of every variable
+        def_blocks = {}
+        global_names = set()
+        for block in blocks:
+            if idom[block.index] is None:
+                continue
+            defined = set()
+            for ins in block.body:
+                for a in ins.args:
+                    if type(a) is str and a not in defined:
+                        global_names.add(a)
+                if not is_temp(ins.dest):
+                    global_names.add(ins.dest)
+                if ins.dest not in defined:
+                    defined.add(ins.dest)
+                    def_blocks.setdefault(ins.dest, []).append(block.index)
+            if block.terminator is not None:
+                global_names.update(name for name in block.terminator.uses() if name not in defined)
+
+        phi_names = [[] for _ in blocks]    # original name of each phi, by block
+        has_phi = [None] * len(blocks)      # last name a phi was placed for
+        queued = [None] * len(blocks)
+        for name, sites in def_blocks.items():
+            if name not in global_names:
+                continue
+            for b in sites:
+                queued[b] = name
+            worklist = list(sites)
+            while worklist:
+                b = worklist.pop()
+                for d in frontier[b]:
+                    if has_phi[d] != name:
+                        has_phi[d] = name
+                        blocks[d].phis.append(Instruction(name, PHI, [name] * len(blocks[d].preds)))
+                        phi_names[d].append(name)
+                        if queued[d] != name:
+                            queued[d] = name
+                            worklist.append(d)
+
+        counters = {}
+        current = {}                        # name → stack of its SSA names
+        children = self.dominator_tree(idom)
+
+        def new_name(name):
+            count = counters.get(name, 0) + 1
+            counters[name] = count
+            renamed = f"{name}#{count}"
+            names = current.get(name)
+            if names is None:
+                current[name] = [renamed]
+            else:
+                names.append(renamed)
+            return renamed
+
+        def read(a):
+            names = current.get(a)
+            return names[-1] if names else a
+
+        # position of each edge's source among the target's predecessors
+        position = {}
+        for block in blocks:
+            for j, p in enumerate(block.preds):
+                position[p, block.index] = j
+
+        # (b, None) enters block b; (None, names) leaves one, popping names
+        stack = [(0, None)] if blocks else []
+        while stack:
+            b, pushed = stack.pop()
+            if b is None:
+                for name in pushed:
+                    current[name].pop()
+                continue
+            block = blocks[b]
+            pushed = []
+            for phi, name in zip(block.phis, phi_names[b]):
+                phi.dest = new_name(name)
+                pushed.append(name)
+            renamed = []
+            for ins in block.body:
+                args = ins.args
+                if ins.op is None:
+                    args = (read(args[0]) if type(args[0]) is str else args[0],)
+                else:
+                    left, right = args
+                    args = (read(left) if type(left) is str else left,
+                            read(right) if type(right) is str else right)
+                renamed.append(Instruction(new_name(ins.dest), ins.op, args))
+                pushed.append(ins.dest)
+            block.body = renamed
+            terminator = block.terminator
+            if terminator is not None and terminator.op == IF:
+                condition = terminator.args[0]
+                if type(condition) is str:
+                    block.terminator = Instruction(None, IF, (read(condition), terminator.args[1]))
+            for s in block.succs:
+                j = position[b, s]
+                for phi, name in zip(blocks[s].phis, phi_names[s]):
+                    phi.args[j] = read(name)
+            stack.append((None, pushed))
+            stack.extend((c, None) for c in reversed(children[b]))
+
+        for block in blocks:
+            for phi in block.phis:
+                phi.args = tuple(phi.args)
+        self.ssa = True
+        return self
+
+
+def unversioned(name):
+    """The name x an SSA name x#2 was renamed from"""
+    return name.partition("#")[0]
+
+
+def build_cfg(code):
+    """
+    CFG of a list of Instructions (see tac_ir.parse_tac). The entry block
+    never has a label, so nothing jumps back to it.
+    """
+    blocks = [BasicBlock(0)]
+    for ins in code:
+        block = blocks[-1]
+        op = ins.op
+        if op == LABEL:
+            blocks.append(BasicBlock(len(blocks), ins.args[0]))
+            continue
+        if block.terminator is not None:
+            block = BasicBlock(len(blocks))
+            blocks.append(block)
+        if op == GOTO or op == IF:
+            block.terminator = ins
+        elif op == PHI:
+            block.phis.append(ins)
+        else:
+            block.body.append(ins)
+    return CFG(blocks)
+
+
+def as_cfg(code):
+    """CFG for TAC lines (str), tac_ir.Instructions or a CFG (returned as is)"""
+    if isinstance(code, CFG):
+        return code
+    code = list(code)
+    if code and not isinstance(code[0], Instruction):
+        code = parse_tac(code)
+    return build_cfg(code)
+
+
+def synthetic_tac(blocks=1000, block_size=8, variables=20, seed=0):
+    """Random TAC with loops and branches: blocks L0, L1, ... of block_size instructions each"""
+    import random
+
+    rng = random.Random(seed)
+    names = [f"v{i}" for i in range(variables)]
+    temp = 0
+    code = []
+    for b in range(blocks):
+        code.append(Instruction(None, LABEL, (f"L{b}",)))
+        for _ in range(block_size - 2):
+            if rng.random() < 0.5:
+                temp += 1
+                dest = temp_name(temp)
+            else:
+                dest = rng.choice(names)
+            code.append(Instruction(dest, rng.choice("+-*"), (rng.choice(names), rng.randint(1, 9))))
+        # loops and branches a few blocks long, like structured code compiles to
+        choice = rng.random()
+        if choice < 0.3 and b:
+            code.append(Instruction(None, IF, (rng.choice(names), f"L{rng.randrange(max(0, b - 8), b)}")))
+        elif choice < 0.6 and b + 1 < blocks:
+            code.append(Instruction(None, IF, (rng.choice(names), f"L{rng.randrange(b + 1, min(blocks, b + 8))}")))
+        elif choice < 0.65 and b + 2 < blocks:
+            code.append(Instruction(None, GOTO, (f"L{b + 2}",)))
+    return code
+
+
+def benchmark(sizes=(10000, 100000, 1000000)):
+    """Seconds per stage for synthetic programs of the given instruction counts"""
+    import time
+
+    rows = []
+    for size in sizes:
+        code = synthetic_tac(blocks=size // 8)
+        row = {"instructions": len(code)}
+        start = time.perf_counter()
+        cfg = build_cfg(code)
+        row["cfg"] = time.perf_counter() - start
+        start = time.perf_counter()
+        idom = cfg.dominators()
+        row["dominators"] = time.perf_counter() - start
+        start = time.perf_counter()
+        cfg.dominance_frontiers(idom)
+        row["frontiers"] = time.perf_counter() - start
+        start = time.perf_counter()
+        cfg.liveness()
+        row["liveness"] = time.perf_counter() - start
+        start = time.perf_counter()
+        cfg.to_ssa()
+        row["ssa"] = time.perf_counter() - start
+        row["phis"] = sum(len(block.phis) for block in cfg.blocks)
+        rows.append(row)
+    return rows
+
+
+# ---------------- Example Usage ----------------
+if __name__ == "__main__":
+    from tac_ir import format_tac
+
+    tac = [
+        "i = 0",
+        "s = 0",
+        "L1:",
+        "%t1 = 10 - i",
+        "if %t1 goto L2",
+        "goto L3",
+        "L2:",
+        "%t2 = s + i",
+        "s = %t2",
+        "i = i + 1",
+        "goto L1",
+        "L3:",
+        "r = s * 2",
+    ]
+    cfg = build_cfg(parse_tac(tac))
+    idom = cfg.dominators()
+    frontier = cfg.dominance_frontiers(idom)
+    print("Blocks:")
+    for block in cfg.blocks:
+        print(f"  B{block.index} {block.label or '':3s} preds={block.preds} succs={block.succs} "
+              f"idom={idom[block.index]} frontier={sorted(frontier[block.index])}")
+    live_in, live_out = cfg.liveness()
+    print("Live in:", [sorted(names) for names in live_in])
+
+    print("\nSSA:")
+    for line in format_tac(cfg.to_ssa().instructions()):
+        print(("  " if not line.endswith(":") else "") + line)
+
+    print()
+    for row in benchmark():
+        print(f"{row['instructions']:8d} instructions: " +
+              ", ".join(f"{stage} {row[stage]:.3f}s" for stage in ("cfg", "dominators", "frontiers", "liveness", "ssa")) +
+              f", {row['phis']} phis")
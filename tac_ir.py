@@ -0,0 +1,144 @@
+"""
+Parsed form of the three-address code that ICG.CodeGenerator emits.
+
+Each TAC line is one Instruction: "x = a" is a copy (op None, one operand),
+"t1 = a + b" a binary operation. Operands are already decoded: names are
+str, constants are int or float, so passes never re-split strings.
+parse_tac() / format_tac() convert from and to the text form.
+
+Control flow has no dest:
+
+  L1:                 LABEL, args (label,)
+  goto L1             GOTO, args (label,)
+  if c goto L1        IF, args (c, label): jump when c is not zero
+  x#2 = phi(x#1, x)   PHI, one argument per predecessor block (SSA only)
+
+tac_cfg.py splits instructions into basic blocks.
+
+Names starting with % (%t1, %t2, ... from temp_name(), and their SSA
+versions %t1#1, ...) are compiler temporaries: they are dead once the
+program ends. No source identifier can contain %, so every other name is a
+program variable, live at the end, even one spelled t1.
+"""
+
+import re
+
+OPERATORS = ("+", "-", "*", "/")
+LABEL, GOTO, IF, PHI = "label", "goto", "if", "phi"
+TEMP_PREFIX = "%"
+_INT = re.compile(r"-?\d+\Z")
+_FLOAT = re.compile(r"-?(\d+\.\d*|\.\d+|\d+(\.\d*)?[eE][-+]?\d+)\Z")
+
+
+class Instruction:
+    __slots__ = ("dest", "op", "args")
+
+    def __init__(self, dest, op, args):
+        self.dest = dest
+        self.op = op        # None (copy), one of OPERATORS, LABEL, GOTO, IF or PHI
+        self.args = args    # (a,) for a copy, (a, b) for a binary operation
+
+    def __eq__(self, other):
+        return (type(other) is Instruction and self.dest == other.dest
+                and self.op == other.op and self.args == other.args)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Instruction({self.dest!r}, {self.op!r}, {self.args!r})"
+
+    def __str__(self):
+        op = self.op
+        if op is None:
+            return f"{self.dest} = {self.args[0]}"
+        if op == LABEL:
+            return f"{self.args[0]}:"
+        if op == GOTO:
+            return f"goto {self.args[0]}"
+        if op == IF:
+            return f"if {self.args[0]} goto {self.args[1]}"
+        if op == PHI:
+            return f"{self.dest} = phi({', '.join(map(str, self.args))})"
+        return f"{self.dest} = {self.args[0]} {op} {self.args[1]}"
+
+    def uses(self):
+        """Names this instruction reads"""
+        op = self.op
+        if op == LABEL or op == GOTO:
+            return ()
+        if op == IF:
+            return (self.args[0],) if type(self.args[0]) is str else ()
+        return tuple(a for a in self.args if type(a) is str)
+
+
+def temp_name(number):
+    return f"{TEMP_PREFIX}t{number}"
+
+
+def is_temp(name):
+    return type(name) is str and name.startswith(TEMP_PREFIX)
+
+
+def is_name(operand):
+    return type(operand) is str
+
+
+def parse_operand(text):
+    if _INT.match(text):
+        return int(text)
+    if _FLOAT.match(text):
+        return float(text)
+    return text
+
+
+def parse_instruction(line):
+    lhs, _, rhs = line.partition("=")
+    dest = lhs.strip()
+    parts = rhs.split()
+    if not rhs:
+        parts = line.split()
+        if len(parts) == 1 and parts[0].endswith(":") and len(parts[0]) > 1:
+            return Instruction(None, LABEL, (parts[0][:-1],))
+        if len(parts) == 2 and parts[0] == "goto":
+            return Instruction(None, GOTO, (parts[1],))
+        if len(parts) == 4 and parts[0] == "if" and parts[2] == "goto":
+            return Instruction(None, IF, (parse_operand(parts[1]), parts[3]))
+        raise ValueError(f"Not a TAC instruction: {line!r}")
+    if not dest or not parts:
+        raise ValueError(f"Not a TAC instruction: {line!r}")
+    if parts[0].startswith("phi(") and rhs.rstrip().endswith(")"):
+        inner = rhs.strip()[4:-1]
+        return Instruction(dest, PHI, tuple(parse_operand(a.strip()) for a in inner.split(",")))
+    if len(parts) == 1:
+        return Instruction(dest, None, (parse_operand(parts[0]),))
+    if len(parts) == 3 and parts[1] in OPERATORS:
+        return Instruction(dest, parts[1], (parse_operand(parts[0]), parse_operand(parts[2])))
+    raise ValueError(f"Not a TAC instruction: {line!r}")
+
+
+def parse_tac(lines):
+    """Instructions for TAC lines such as ICG.CodeGenerator().generate() returns"""
+    return [parse_instruction(line) for line in lines]
+
+
+def format_tac(instructions):
+    return [str(instruction) for instruction in instructions]
+
+
+def evaluate(op, a, b):
+    """a op b for constants, or None if it cannot be folded (division by zero, overflow)"""
+    try:
+        if op == "+":
+            return a + b
+        if op == "-":
+            return a - b
+        if op == "*":
+            return a * b
+        if b == 0:
+            return None
+        # the language divides ints like the original optimizer did, with //
+        if type(a) is int and type(b) is int:
+            return a // b
+        return a / b
+    except OverflowError:
+        return None
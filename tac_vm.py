@@ -0,0 +1,274 @@
+"""
+Run three-address code: compile it to a compact bytecode and execute it in
+a dispatch loop.
+
+Bytecode: every instruction is 4 ints (opcode, dest, a, b) packed into one
+array('i'). Operands are slot numbers: variables come first, then the
+constant pool, so an instruction never checks whether an operand is a name
+or a number. Jumps hold the index of their target instruction.
+
+  MOVE d, a           slots[d] = slots[a]
+  ADD/SUB/MUL/DIV d, a, b
+  JUMP target         JUMP_IF a, target (jump when slots[a] is not zero)
+  HALT
+
+Division is // for two ints, like tac_ir.evaluate. Variables that are read
+before they are assigned start at 0 unless given as inputs.
+
+interpret_tac() is the naive alternative, re-splitting every TAC line each
+time it runs; benchmark() compares the two.
+
+Usage:
+  - python tac_vm.py                  # example, then the benchmark
+"""
+
+from array import array
+
+from tac_cfg import as_cfg
+from tac_ir import GOTO, is_temp, parse_operand
+
+MOVE, ADD, SUB, MUL, DIV, JUMP, JUMP_IF, HALT = range(8)
+OPCODES = {"+": ADD, "-": SUB, "*": MUL, "/": DIV}
+OPCODE_NAMES = ("MOVE", "ADD", "SUB", "MUL", "DIV", "JUMP", "JUMP_IF", "HALT")
+
+
+class Bytecode:
+    def __init__(self, code, names, constants):
+        self.code = code            # array('i'), 4 ints per instruction
+        self.names = names          # slot → variable name, for slots [0, len(names))
+        self.constants = constants  # slot len(names) + i holds constants[i]
+
+    def __len__(self):
+        return len(self.code) // 4
+
+    def nbytes(self):
+        return self.code.itemsize * len(self.code)
+
+    def disassemble(self):
+        def slot(i):
+            return self.names[i] if i < len(self.names) else repr(self.constants[i - len(self.names)])
+
+        lines = []
+        for pc in range(len(self)):
+            op, d, a, b = self.code[4 * pc:4 * pc + 4]
+            if op == MOVE:
+                lines.append(f"{pc:4d} MOVE {slot(d)}, {slot(a)}")
+            elif op == JUMP:
+                lines.append(f"{pc:4d} JUMP {d}")
+            elif op == JUMP_IF:
+                lines.append(f"{pc:4d} JUMP_IF {slot(a)}, {d}")
+            elif op == HALT:
+                lines.append(f"{pc:4d} HALT")
+            else:
+                lines.append(f"{pc:4d} {OPCODE_NAMES[op]} {slot(d)}, {slot(a)}, {slot(b)}")
+        return lines
+
+
+def compile_tac(tac):
+    """Bytecode for TAC lines (str), tac_ir.Instructions or a tac_cfg.CFG"""
+    cfg = as_cfg(tac)
+    names = {}
+    constants = {}      # (type, value) → index, 1 and 1.0 are different constants
+    pending = []        # constant operands: (position in code, constant index)
+    code = array("i")
+    jumps = []          # (position in code, label)
+    targets = {}
+
+    def operand(a, position):
+        if type(a) is str:
+            if a not in names:
+                names[a] = len(names)
+            return names[a]
+        pending.append((position, constants.setdefault((type(a), a), len(constants))))
+        return 0
+
+    if cfg.ssa:
+        raise ValueError("Cannot run SSA form (phi instructions, x#1 names)")
+    for block in cfg.blocks:
+        if block.label is not None:
+            targets[block.label] = len(code) // 4
+        for ins in block.body:
+            position = len(code)
+            dest = operand(ins.dest, position + 1)
+            if ins.op is None:
+                code.extend((MOVE, dest, operand(ins.args[0], position + 2), 0))
+            else:
+                a, b = ins.args
+                code.extend((OPCODES[ins.op], dest, operand(a, position + 2), operand(b, position + 3)))
+        terminator = block.terminator
+        if terminator is not None:
+            position = len(code)
+            jumps.append((position + 1, terminator.args[-1]))
+            if terminator.op == GOTO:
+                code.extend((JUMP, 0, 0, 0))
+            else:
+                code.extend((JUMP_IF, 0, operand(terminator.args[0], position + 2), 0))
+    code.extend((HALT, 0, 0, 0))
+
+    for position, label in jumps:
+        code[position] = targets[label]
+    for position, index in pending:
+        code[position] = len(names) + index
+    return Bytecode(code, list(names), [value for _, value in constants])
+
+
+class VM:
+    def __init__(self, bytecode):
+        self.bytecode = bytecode
+        code = bytecode.code.tolist()
+        # one tuple per instruction: unpacking a tuple is the cheapest decode
+        self.program = list(zip(code[0::4], code[1::4], code[2::4], code[3::4]))
+
+    def run(self, inputs=None):
+        """{variable: value} after running, for every variable that is not a temporary"""
+        names = self.bytecode.names
+        slots = [0] * len(names) + self.bytecode.constants
+        if inputs:
+            for i, name in enumerate(names):
+                if name in inputs:
+                    slots[i] = inputs[name]
+        program = self.program
+        pc = 0
+        while True:
+            op, d, a, b = program[pc]
+            pc += 1
+            if op == ADD:
+                slots[d] = slots[a] + slots[b]
+            elif op == MOVE:
+                slots[d] = slots[a]
+            elif op == MUL:
+                slots[d] = slots[a] * slots[b]
+            elif op == SUB:
+                slots[d] = slots[a] - slots[b]
+            elif op == JUMP_IF:
+                if slots[a]:
+                    pc = d
+            elif op == JUMP:
+                pc = d
+            elif op == DIV:
+                x, y = slots[a], slots[b]
+                slots[d] = x // y if type(x) is int and type(y) is int else x / y
+            else:
+                break
+        return {name: slots[i] for i, name in enumerate(names) if not is_temp(name)}
+
+
+def run_tac(tac, inputs=None):
+    return VM(compile_tac(tac)).run(inputs)
+
+
+def interpret_tac(lines, inputs=None):
+    """The naive way: walk the TAC text, splitting and decoding each line every time it runs"""
+    env = dict(inputs or {})
+    labels = {line.strip()[:-1]: i for i, line in enumerate(lines) if line.strip().endswith(":")}
+
+    def value(text):
+        operand = parse_operand(text)
+        return env.get(operand, 0) if type(operand) is str else operand
+
+    pc = 0
+    while pc < len(lines):
+        line = lines[pc]
+        pc += 1
+        parts = line.split()
+        if len(parts) == 1:
+            continue
+        if parts[0] == "goto":
+            pc = labels[parts[1]]
+        elif parts[0] == "if":
+            if value(parts[1]):
+                pc = labels[parts[3]]
+        elif len(parts) == 3:
+            env[parts[0]] = value(parts[2])
+        else:
+            x, y = value(parts[2]), value(parts[4])
+            op = parts[3]
+            if op == "+":
+                env[parts[0]] = x + y
+            elif op == "-":
+                env[parts[0]] = x - y
+            elif op == "*":
+                env[parts[0]] = x * y
+            else:
+                env[parts[0]] = x // y if type(x) is int and type(y) is int else x / y
+    return {name: v for name, v in env.items() if not is_temp(name)}
+
+
+def loop_tac(iterations):
+    """TAC for an arithmetic loop: a polynomial sum and a running average"""
+    return [
+        "i = 0",
+        "s = 0",
+        "avg = 0.0",
+        f"n = {iterations}",
+        "L1:",
+        "%t1 = i * i",
+        "%t2 = %t1 * 3",
+        "%t3 = i * 7",
+        "%t4 = %t2 - %t3",
+        "%t5 = %t4 + 11",
+        "s = s + %t5",
+        "%t6 = avg * 0.9",
+        "%t7 = i / 3",
+        "%t8 = %t7 * 0.1",
+        "avg = %t6 + %t8",
+        "i = i + 1",
+        "%t9 = n - i",
+        "if %t9 goto L1",
+    ]
+
+
+def benchmark(iterations=100000, statements=20000, repeats=3):
+    """Best-of-`repeats` seconds: naive vs bytecode on a loop, unoptimized vs optimized TAC in the VM"""
+    import time
+
+    from Code_Optimization import Optimizer
+    from ICG import CodeGenerator, Parser, lexer
+
+    def best_of(func):
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = func()
+            best = min(best, time.perf_counter() - start)
+        return best, result
+
+    rows = []
+    loop = loop_tac(iterations)
+    naive, expected = best_of(lambda: interpret_tac(loop))
+    vm = VM(compile_tac(loop))
+    fast, result = best_of(vm.run)
+    assert result == expected
+    rows.append({"program": f"loop x{iterations}", "naive": naive, "vm": fast})
+
+    lines = [f"int v{i};" for i in range(100)]
+    for i in range(statements):
+        a, b = f"v{i % 100}", f"v{(i * 7) % 100}"
+        # contracting, so the values stay small over thousands of statements
+        lines.append(f"v{(i * 3) % 100} = ({a} + {b}) * 1 / 4 - ({a} - {b}) / 7 + (2 + 3) * {i % 3};")
+    tac = CodeGenerator().generate(Parser(lexer("\n".join(lines))).parse())
+    inputs = {f"v{i}": i for i in range(100)}
+    for name, code in (("ICG", tac), ("ICG optimized", Optimizer(tac).optimize())):
+        naive, expected = best_of(lambda: interpret_tac(code, inputs))
+        bytecode = compile_tac(code)
+        vm = VM(bytecode)
+        fast, result = best_of(lambda: vm.run(inputs))
+        assert result == expected
+        rows.append({"program": f"{name} ({len(bytecode)} instructions)", "naive": naive, "vm": fast})
+    return rows
+
+
+# ---------------- Example Usage ----------------
+if __name__ == "__main__":
+    tac = loop_tac(10)
+    bytecode = compile_tac(tac)
+    print("Bytecode:")
+    for line in bytecode.disassemble():
+        print(" ", line)
+    print(f"{len(bytecode)} instructions, {bytecode.nbytes()} bytes, constants {bytecode.constants}")
+    print("Result:", VM(bytecode).run())
+
+    print()
+    for row in benchmark():
+        print(f"{row['program']:36s} naive {row['naive'] * 1000:8.1f} ms   vm {row['vm'] * 1000:8.1f} ms "
+              f"({row['naive'] / row['vm']:.1f}x)")